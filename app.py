@@ -1,12 +1,13 @@
 import sys
 
 import streamlit as st
+import hashlib
+import json
 import os
-import PyPDF2
-from pathlib import Path
 import tempfile
+import threading
 import time
-import chardet
+from contextlib import contextmanager
 
 
 
@@ -14,10 +15,24 @@ import chardet
 __import__('pysqlite3')
 sys.modules['sqlite3'] = sys.modules.pop('pysqlite3')
 
-from crewai import Agent, Task, Crew, Process
-from crewai_tools import FileWriterTool, SerperDevTool, GithubSearchTool, LinkupSearchTool, EXASearchTool
+from crewai import Agent, Task
 from dotenv import load_dotenv
 
+from document_context import DocumentContext, EXCERPT_QUERIES
+from document_digest import create_digest_llm, load_or_build_digest, needs_digest, overview_fingerprint
+from document_index import DocumentIndex
+from file_index import OUTPUT_FOLDERS, ContentCache, FileIndex, read_text
+from llm_cache import CachedLLM
+from output_export import iter_output_zip
+from output_watcher import OutputWatcher
+from incremental import diff_pages, is_revision, page_hash, seed_incremental_run
+from pdf_extraction import iter_pages
+from run_store import (APP_PIPELINE, RunCheckpoint, collect_old_runs, document_digest, find_previous_version,
+                       load_document_manifest, prepare_run_dir, run_key, run_output_dir, load_run_file, load_run_result,
+                       save_document_manifest, save_run_file, save_run_result)
+from task_scheduler import MAX_PARALLEL_TASKS, run_task_graph
+from tool_registry import get_tools, reset_tools
+
 # Load environment variables
 _ = load_dotenv()
 
@@ -26,68 +41,91 @@ _ = load_dotenv()
 os.environ["OPENAI_API_BASE"] = "https://api.aimlapi.com/v1"
 os.environ["OPENAI_API_KEY"] = os.getenv("AIML_API_KEY", "<YOUR_API_KEY>")
 
+# Characters of extracted text kept for the preview; the full text is never stored with a run
+PREVIEW_CHARS = 20000
+
+# Size of a zip export held in memory before it is spooled to disk
+EXPORT_SPOOL_BYTES = 16 * 1024 * 1024
+
+# Characters of a generated file rendered at a time; "Load more" shows the next page
+FILE_PAGE_CHARS = int(os.getenv("FILE_PAGE_CHARS", "50000"))
+
+# Output folders whose listing is kept between reruns: the three folders of the 16 latest runs
+FILE_INDEX_ENTRIES = 3 * 16
+
 # Configure LLM for CrewAI
 llm_config = "openai/gpt-5-chat-latest"
 
-# Initialize tools
-file_writer = FileWriterTool()
-serper_tool = SerperDevTool()
-github_search_tool = GithubSearchTool(
-    gh_token=os.getenv("GITHUB_TOKEN"),
-    content_types=['code', 'issue'],
-    max_results=500
-)
-linkup_tool = LinkupSearchTool(api_key=os.getenv("LINKUP_API_KEY"))
-exascience_tool = EXASearchTool(api_key=os.getenv("EXA_API_KEY"))
-
-def read_pdf_content(pdf_file) -> str:
-    """Read and extract text content from uploaded PDF with better encoding handling"""
-    try:
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        text_content = ""
-        
-        for page_num in range(len(pdf_reader.pages)):
-            page = pdf_reader.pages[page_num]
-            try:
-                page_text = page.extract_text()
-                if page_text:
-                    # Clean up common PDF encoding issues
-                    page_text = page_text.replace('\x96', '-')  # Replace problematic byte
-                    page_text = page_text.replace('\x97', '-')  # Replace problematic byte
-                    page_text = page_text.replace('\x94', '"')  # Replace problematic byte
-                    page_text = page_text.replace('\x93', '"')  # Replace problematic byte
-                    text_content += page_text + "\n"
-            except Exception as e:
-                st.warning(f"Warning: Could not extract text from page {page_num + 1}: {str(e)}")
-                continue
-        
-        if not text_content.strip():
-            return "Warning: No text could be extracted from the PDF. The file might be image-based or corrupted."
-        
-        return text_content
-    except Exception as e:
-        return f"Error reading PDF: {str(e)}"
+# API keys whose presence decides which tools the agents get
+TOOL_KEYS = ["SERPER_API_KEY", "GITHUB_TOKEN", "LINKUP_API_KEY", "EXA_API_KEY"]
+
+
+def resource_config_key() -> str:
+    """Fingerprint of the settings long-lived resources are built from; a change rebuilds them"""
+    config = {
+        "llm": llm_config,
+        "api_base": os.getenv("OPENAI_API_BASE"),
+        "api_key": hashlib.sha256(os.getenv("OPENAI_API_KEY", "").encode("utf-8")).hexdigest(),
+        "tools": {key: bool(os.getenv(key)) for key in TOOL_KEYS},
+    }
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def get_llm(config_key: str):
+    """LLM client shared by every session and rerun of this process"""
+    return CachedLLM(model=llm_config)
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def get_digest_llm(config_key: str):
+    return create_digest_llm(llm_config)
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def get_agent_templates(config_key: str):
+    """Agents built once per configuration; runs work on copies of them"""
+    # Tool instances were built for the previous configuration
+    reset_tools()
+    return create_agents(get_llm(config_key))
+
+
+def stream_pdf_pages(pdf_file, hashes, warn=True):
+    """Yield the PDF pages, fingerprinting each into ``hashes`` and, with ``warn``, reporting unreadable ones"""
+    for page in iter_pages(pdf_file):
+        hashes.append(page_hash(page.text))
+        if warn and page.error:
+            st.warning(f"Warning: Could not extract text from page {page.number}: {page.error}")
+        yield page
+
+def pdf_fingerprints(pdf_file, run_id):
+    """Page fingerprints and overview fingerprint of an uploaded PDF, kept for the session; its text is not kept"""
+    fingerprints = st.session_state.setdefault("pdf_fingerprints", {})
+    if run_id not in fingerprints:
+        hashes = []
+        # Unreadable pages are reported once the analysis starts
+        document = DocumentContext.from_pages(stream_pdf_pages(pdf_file, hashes, warn=False))
+        fingerprints[run_id] = hashes, overview_fingerprint(document.chunks)
+    return fingerprints[run_id]
+
+def read_pdf_document(pdf_file):
+    """Read the uploaded PDF in one pass; returns its DocumentContext and page fingerprints"""
+    hashes = []
+    document = DocumentContext.from_pages(stream_pdf_pages(pdf_file, hashes))
+    if not document.has_text():
+        document = DocumentContext.from_text(
+            "Warning: No text could be extracted from the PDF. The file might be image-based or corrupted."
+        )
+    return document, hashes
 
 def safe_read_file(file_path):
     """Safely read file content with encoding detection"""
     try:
-        # First try UTF-8
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
-    except UnicodeDecodeError:
-        try:
-            # Try to detect encoding
-            with open(file_path, 'rb') as f:
-                raw_data = f.read()
-                detected = chardet.detect(raw_data)
-                encoding = detected['encoding'] if detected['encoding'] else 'latin-1'
-            
-            with open(file_path, 'r', encoding=encoding) as f:
-                return f.read()
-        except Exception as e:
-            return f"Error reading file {file_path.name}: {str(e)}"
+        return read_text(file_path)
+    except Exception as e:
+        return f"Error reading file {file_path.name}: {str(e)}"
 
-def create_agents():
+def create_agents(llm):
     """Create and return the CrewAI agents"""
     
     # Project Analysis Agent
@@ -100,10 +138,10 @@ def create_agents():
             "You have access to the full project document content and can research "
             "similar projects on the web to provide comprehensive market analysis."
         ),
-        tools=[file_writer, serper_tool],
+        tools=get_tools("file_writer", "serper"),
         verbose=True,
         memory=True,
-        llm=llm_config
+        llm=llm
     )
 
     # Resource Search Agent
@@ -115,10 +153,10 @@ def create_agents():
             "academic databases, and open-source ecosystems. Expert at evaluating resource quality, "
             "licensing compatibility, and relevance scoring."
         ),
-        tools=[file_writer, serper_tool, github_search_tool, linkup_tool],
+        tools=get_tools("file_writer", "serper", "github_search", "linkup"),
         verbose=True,
         memory=True,
-        llm=llm_config
+        llm=llm
     )
 
     # Coding Agent
@@ -130,38 +168,39 @@ def create_agents():
             "frameworks, and design patterns. Specializes in rapid prototyping while maintaining code quality and scalability. "
             "Expert in Python, JavaScript/TypeScript, React, Node.js, and modern development practices."
         ),
-        tools=[file_writer],
+        tools=get_tools("file_writer"),
         verbose=True,
         memory=True,
         # allow_code_execution=True,
-        llm=llm_config
+        llm=llm
     )
     
     return project_analyst, resource_search_agent, coding_agent
 
-def create_tasks(agents, pdf_content):
-    """Create and return the CrewAI tasks"""
+def create_tasks(agents, document, output_root):
+    """Create and return the CrewAI tasks for a DocumentContext, writing into the run's output root"""
     
     project_analyst, resource_search_agent, coding_agent = agents
     
     # Create output folders
-    output_folder = Path("project_analysis_output")
-    output_folder.mkdir(exist_ok=True)
+    output_folder = output_root / "project_analysis_output"
+    output_folder.mkdir(parents=True, exist_ok=True)
     
-    resource_folder = Path("resource_output")
-    resource_folder.mkdir(exist_ok=True)
+    resource_folder = output_root / "resource_output"
+    resource_folder.mkdir(parents=True, exist_ok=True)
     
-    code_folder = Path("code_output")
-    code_folder.mkdir(exist_ok=True)
+    code_folder = output_root / "code_output"
+    code_folder.mkdir(parents=True, exist_ok=True)
     
     # ===== FIRST AGENT TASKS (Project Analysis) =====
     
     # Task 1: Project Context Analysis with web research
     project_context_task = Task(
+        name="project_context",
         description=(
             f"CRITICAL: You MUST read the PDF content from the input context and extract REAL information.\n\n"
             f"SPECIFIC INSTRUCTIONS:\n"
-            f"1. Look at the 'full_content' field in the input\n"
+            f"1. Read the project document content below\n"
             f"2. Extract the actual project name from the 'project_name' field\n"
             f"3. Find real requirements mentioned in the PDF content\n"
             f"4. Identify actual technology stack mentioned in the 'technology_stack' field\n"
@@ -179,7 +218,7 @@ def create_tasks(agents, pdf_content):
             f"- Recent funding and acquisition news\n\n"
             f"USE FileWriterTool to write this to '{output_folder}/project_analysis.md'\n"
             f"DO NOT use placeholders like [Detail] or [Project Name] - use REAL data from the PDF!\n\n"
-            f"Project Document Content:\n{pdf_content}"
+            f"Project Document Content:\n{document.overview()}"
         ),
         expected_output=(
             f"A REAL project analysis report saved as '{output_folder}/project_analysis.md' containing:\n"
@@ -201,10 +240,11 @@ def create_tasks(agents, pdf_content):
 
     # Task 2: Objective Clarification with market research
     objective_task = Task(
+        name="objective",
         description=(
             f"CRITICAL: Based on the ACTUAL PDF content in the input, break down real project goals into specific objectives.\n\n"
             f"SPECIFIC INSTRUCTIONS:\n"
-            f"1. Read the 'full_content' field in the input\n"
+            f"1. Read the project context analysis you were given and the document excerpts below\n"
             f"2. Extract the actual project goals mentioned in the PDF\n"
             f"3. Identify real secondary goals from the PDF content\n"
             f"4. Find specific acceptance criteria mentioned in the PDF\n"
@@ -216,7 +256,7 @@ def create_tasks(agents, pdf_content):
             f"- Industry benchmarks for engagement and ROI metrics\n\n"
             f"USE FileWriterTool to write this to '{output_folder}/project_objectives.md'\n"
             f"DO NOT use placeholders - use REAL data from the PDF!\n\n"
-            f"Project Document Content:\n{pdf_content}"
+            f"Relevant Document Excerpts:\n{document.excerpts(EXCERPT_QUERIES['objectives'])}"
         ),
         expected_output=(
             f"A REAL objectives document saved as '{output_folder}/project_objectives.md' containing:\n"
@@ -227,15 +267,17 @@ def create_tasks(agents, pdf_content):
             "- WEB RESEARCH: Market validation insights and industry benchmarks\n\n"
             "Use FileWriterTool to save this with real data, not placeholders."
         ),
-        agent=project_analyst
+        agent=project_analyst,
+        context=[project_context_task]
     )
 
     # Task 3: Technical Feasibility Assessment with technology research
     technical_task = Task(
+        name="technical",
         description=(
             f"CRITICAL: Evaluate the technical complexity of the ACTUAL project described in the PDF content.\n\n"
             f"SPECIFIC INSTRUCTIONS:\n"
-            f"1. Read the 'full_content' field in the input\n"
+            f"1. Read the project context analysis you were given and the document excerpts below\n"
             f"2. Analyze the real technology stack mentioned in the 'technology_stack' field\n"
             f"3. Assess the actual project complexity based on real requirements\n"
             f"4. Identify real prerequisite skills needed for the specific technologies\n"
@@ -248,7 +290,7 @@ def create_tasks(agents, pdf_content):
             f"- Technical challenges in social media automation\n\n"
             f"USE FileWriterTool to write this to '{output_folder}/technical_assessment.md'\n"
             f"DO NOT use placeholders - use REAL data from the PDF!\n\n"
-            f"Project Document Content:\n{pdf_content}"
+            f"Relevant Document Excerpts:\n{document.excerpts(EXCERPT_QUERIES['technical'])}"
         ),
         expected_output=(
             f"A REAL technical assessment saved as '{output_folder}/technical_assessment.md' containing:\n"
@@ -258,15 +300,17 @@ def create_tasks(agents, pdf_content):
             "- WEB RESEARCH: Latest AI/ML technologies, API limitations, and technical challenges\n\n"
             "Use FileWriterTool to save this with real data, not placeholders."
         ),
-        agent=project_analyst
+        agent=project_analyst,
+        context=[project_context_task]
     )
 
     # Task 4: Resource Requirements Planning with market insights
     resource_task = Task(
+        name="resource",
         description=(
             f"CRITICAL: Based on the ACTUAL project requirements from the PDF, determine what real resources are needed.\n\n"
             f"SPECIFIC INSTRUCTIONS:\n"
-            f"1. Read the 'full_content' field in the input\n"
+            f"1. Read the project context analysis you were given and the document excerpts below\n"
             f"2. Analyze the actual technology stack mentioned in the 'technology_stack' field\n"
             f"3. Identify real datasets needed for the specific project\n"
             f"4. Determine actual documentation requirements based on the real scope\n"
@@ -280,7 +324,7 @@ def create_tasks(agents, pdf_content):
             f"- Legal and compliance costs for social media tools\n\n"
             f"USE FileWriterTool to write this to '{output_folder}/resource_planning.md'\n"
             f"DO NOT use placeholders - use REAL data from the PDF!\n\n"
-            f"Project Document Content:\n{pdf_content}"
+            f"Relevant Document Excerpts:\n{document.excerpts(EXCERPT_QUERIES['resources'])}"
         ),
         expected_output=(
             f"A REAL resource plan saved as '{output_folder}/resource_planning.md' containing:\n"
@@ -291,13 +335,15 @@ def create_tasks(agents, pdf_content):
             "- WEB RESEARCH: Current market costs, developer rates, and infrastructure pricing\n\n"
             "Use FileWriterTool to save this with real data, not placeholders."
         ),
-        agent=project_analyst
+        agent=project_analyst,
+        context=[project_context_task]
     )
 
     # ===== SECOND AGENT TASKS (Resource Search) =====
     
     # Task 5: Multi-platform resource discovery
     multi_platform_discovery_task = Task(
+        name="multi_platform_discovery",
         description=(
             f"Based on the project analysis files created by the first agent, search across GitHub, Kaggle, ArXiv, StackOverflow, and documentation sites using "
             f"intelligent query expansion and semantic matching.\n\n"
@@ -320,11 +366,13 @@ def create_tasks(agents, pdf_content):
             "- Categorized by platform (GitHub, Kaggle, ArXiv, StackOverflow, Documentation)\n\n"
             "Use FileWriterTool to save this with real search results. Ensure you have at least 10 resources total."
         ),
-        agent=resource_search_agent
+        agent=resource_search_agent,
+        context=[project_context_task, technical_task, resource_task]
     )
 
     # Task 6: Code repository analysis and filtering
     code_repository_analysis_task = Task(
+        name="code_repository_analysis",
         description=(
             f"Based on the project analysis, analyze GitHub repositories for code quality, maintenance status, licensing, and "
             f"compatibility with project requirements.\n\n"
@@ -348,11 +396,13 @@ def create_tasks(agents, pdf_content):
             "- Star count, last updated, and language information\n\n"
             "Use FileWriterTool to save this with real repository analysis. Ensure you have at least 10 repositories."
         ),
-        agent=resource_search_agent
+        agent=resource_search_agent,
+        context=[project_context_task, technical_task]
     )
 
     # Task 7: Dataset discovery and validation
     dataset_discovery_task = Task(
+        name="dataset_discovery",
         description=(
             f"Based on the project requirements, find relevant datasets on Kaggle, academic repositories, and government data portals, "
             f"validating data quality and format compatibility.\n\n"
@@ -377,11 +427,13 @@ def create_tasks(agents, pdf_content):
             "- Source platform and last updated information\n\n"
             "Use FileWriterTool to save this with real dataset findings. Ensure you have at least 10 datasets."
         ),
-        agent=resource_search_agent
+        agent=resource_search_agent,
+        context=[project_context_task, resource_task]
     )
 
     # Task 8: Academic paper and documentation retrieval
     academic_paper_task = Task(
+        name="academic_paper",
         description=(
             f"Based on the project scope, search ArXiv, research databases, and technical documentation for relevant papers, "
             f"tutorials, and implementation guides.\n\n"
@@ -406,11 +458,13 @@ def create_tasks(agents, pdf_content):
             "- Publication date and author information\n\n"
             "Use FileWriterTool to save this with real academic research findings. Ensure you have at least 10 resources."
         ),
-        agent=resource_search_agent
+        agent=resource_search_agent,
+        context=[project_context_task, technical_task]
     )
 
     # Task 9: Real-time resource monitoring
     realtime_monitoring_task = Task(
+        name="realtime_monitoring",
         description=(
             f"Based on the project timeline and requirements, continuously monitor for new releases, updates, or trending resources "
             f"related to the project domain.\n\n"
@@ -436,13 +490,15 @@ def create_tasks(agents, pdf_content):
             "- Publication/update dates\n\n"
             "Use FileWriterTool to save this with real-time findings. Ensure you have at least 10 resources."
         ),
-        agent=resource_search_agent
+        agent=resource_search_agent,
+        context=[project_context_task, objective_task]
     )
 
     # ===== THIRD AGENT TASKS (Coding and Development) =====
     
     # Task 10: Project Architecture Design
     architecture_design_task = Task(
+        name="architecture_design",
         description=(
             f"Based on the project analysis files from '{output_folder}/', design the overall system architecture "
             f"for the AI-powered social media marketing platform.\n\n"
@@ -468,11 +524,13 @@ def create_tasks(agents, pdf_content):
             "- Python script for creating project structure\n\n"
             "Use FileWriterTool to save this with detailed architectural guidance."
         ),
-        agent=coding_agent
+        agent=coding_agent,
+        context=[project_context_task, technical_task]
     )
 
     # Task 11: Starter Template Generation
     starter_template_task = Task(
+        name="starter_template",
         description=(
             f"Based on the architecture design and project requirements, generate a complete project scaffolding "
             f"with boilerplate code, configuration files, and basic functionality implementations.\n\n"
@@ -499,11 +557,13 @@ def create_tasks(agents, pdf_content):
             "- Comprehensive setup instructions\n\n"
             "Use FileWriterTool to save setup instructions and generate all code files."
         ),
-        agent=coding_agent
+        agent=coding_agent,
+        context=[technical_task, architecture_design_task]
     )
 
     # Task 12: Custom Function and Component Creation
     custom_components_task = Task(
+        name="custom_components",
         description=(
             f"Based on the project requirements, generate specific functions, classes, and components "
             f"for the AI-powered social media marketing platform.\n\n"
@@ -530,11 +590,13 @@ def create_tasks(agents, pdf_content):
             "- Usage examples and integration guidelines\n\n"
             "Use FileWriterTool to save this with real data, not placeholders."
         ),
-        agent=coding_agent
+        agent=coding_agent,
+        context=[project_context_task, objective_task, architecture_design_task]
     )
 
     # Task 13: API Integration Code Generation
     api_integration_task = Task(
+        name="api_integration",
         description=(
             f"Create wrapper functions and integration code for external APIs, databases, and third-party services "
             f"required for the social media marketing platform.\n\n"
@@ -561,11 +623,13 @@ def create_tasks(agents, pdf_content):
             "- Security best practices implementation\n\n"
             "Use FileWriterTool to save this with real data, not placeholders."
         ),
-        agent=coding_agent
+        agent=coding_agent,
+        context=[technical_task, architecture_design_task]
     )
 
     # Task 14: Testing and Validation Code Creation
     testing_validation_task = Task(
+        name="testing_validation",
         description=(
             f"Generate comprehensive unit tests, integration tests, and validation scripts "
             f"to ensure code reliability and performance for the social media marketing platform.\n\n"
@@ -592,18 +656,21 @@ def create_tasks(agents, pdf_content):
             "- Coverage reporting setup\n\n"
             "Use FileWriterTool to save this with real data, not placeholders."
         ),
-        agent=coding_agent
+        agent=coding_agent,
+        context=[starter_template_task, custom_components_task, api_integration_task]
     )
 
     # Task 15: Additional Analysis Task
     analysis_task = Task(
+        name="analysis",
         description=(
-            f"Analyze the following project document content and identify key project goals, risks, challenges, and potential improvements. "
-            f"Your final answer MUST be structured as a Markdown report with sections for Summary, Risks, Strengths, and Opportunities.\n\n"
-            f"Project Document Content:\n{pdf_content}"
+            f"Using the project context analysis, objectives, technical assessment and resource plan you were given, "
+            f"identify key project goals, risks, challenges, and potential improvements. "
+            f"Your final answer MUST be structured as a Markdown report with sections for Summary, Risks, Strengths, and Opportunities."
         ),
         expected_output="A structured Markdown analysis report of the project.",
-        agent=project_analyst
+        agent=project_analyst,
+        context=[project_context_task, objective_task, technical_task, resource_task]
     )
     
     # Return all 15 tasks in the correct order
@@ -629,33 +696,327 @@ def create_tasks(agents, pdf_content):
         analysis_task
     ]
 
-def run_crew_analysis(pdf_content):
-    """Run the CrewAI analysis and return results"""
+def prepare_document_context(document, run_id, resume=True, previous_version=None, carry_forward=False):
+    """Get the document ready for a run, digesting it first when it is too long for the prompts.
+
+    ``previous_version`` is the run of an earlier version of the document:
+    its digest notes are reused for the parts the versions share and, with
+    ``carry_forward``, its excerpts too, so tasks reading the same passages
+    get the same prompts and can be carried forward.
+    """
+    # A resumed run gets back the digest and excerpts of its first attempt, so its checkpoints stay valid
+    if resume:
+        document.pin_excerpts(load_run_file(run_id, "excerpts.json") or {})
+    if carry_forward and previous_version is not None:
+        document.pin_excerpts(load_run_file(previous_version, "excerpts.json") or {})
+    if needs_digest(document.chunks):
+        document.digest_report = load_or_build_digest(
+            document.chunks, get_digest_llm(resource_config_key()), run_id, reuse=resume,
+            previous_run_id=previous_version
+        )
+    if document.needs_retrieval() and not document.has_pinned(EXCERPT_QUERIES.values()):
+        try:
+            document.index = DocumentIndex.build(document.chunks, run_id)
+        except Exception as e:
+            # Embeddings unavailable (offline, no key); tasks fall back to keyword excerpts
+            st.warning(f"Warning: Could not build the retrieval index, using keyword excerpts: {str(e)}")
+    return document
+
+@st.cache_resource(show_spinner=False)
+def get_active_runs():
+    """Run ids being analyzed by a session of this process, with the lock guarding them"""
+    return set(), threading.Lock()
+
+@contextmanager
+def claim_run(run_id):
+    """Let only one session at a time work on a run's folder and checkpoints"""
+    active, lock = get_active_runs()
+    with lock:
+        if run_id in active:
+            raise RuntimeError("This document is already being analyzed in another session; try again once it finishes.")
+        active.add(run_id)
+    try:
+        yield
+    finally:
+        with lock:
+            active.discard(run_id)
+
+def run_crew_analysis(document, run_id, resume=True, previous_run_id=None):
+    """Run the CrewAI analysis and return results, plus which tasks were carried forward"""
+    
+    # Each run writes into its own folder, so concurrent runs never share files
+    output_root = prepare_run_dir(run_id)
+    collect_old_runs(keep={run_id, previous_run_id})
+    
+    # Create agents and tasks; agents keep per-run state, so each run copies the cached templates
+    agents = tuple(agent.copy() for agent in get_agent_templates(resource_config_key()))
+    tasks = create_tasks(agents, document, output_root)
+    save_run_file(run_id, "excerpts.json", document.pinned_excerpts)
+    
+    # Completed tasks are checkpointed so a failed run can pick up where it stopped
+    checkpoint = RunCheckpoint(run_id)
+    if not resume:
+        checkpoint.clear()
+    
+    # For a revised document, reuse the previous version's outputs of tasks whose inputs did not change
+    report = []
+    if previous_run_id is not None:
+        report = seed_incremental_run(
+            tasks, checkpoint, RunCheckpoint(previous_run_id),
+            output_root=output_root, previous_output_root=run_output_dir(previous_run_id)
+        )
+    
+    # Run the tasks as a dependency graph so independent ones overlap
+    outputs = run_task_graph(tasks, max_parallel=MAX_PARALLEL_TASKS, checkpoint=checkpoint, output_root=output_root)
+    
+    # The last task produces the final report
+    return outputs[tasks[-1].name].raw, report
+
+@st.cache_resource(show_spinner=False)
+def get_output_watcher():
+    """File-change notifications for every run's output folders, one watcher per process"""
+    return OutputWatcher().start()
+
+# No timed refresh: the panel is only shown once the run has finished writing its files
+@st.fragment
+def render_files_panel(output_root):
+    """The generated files section of a run; its button refreshes it without rerunning the page"""
+    watcher = get_output_watcher()
+    seen = st.session_state.get("files_version")
+    changed = []
+    if seen is not None and watcher.version != seen:
+        changed = [path for path in watcher.changes_since(seen) if output_root.resolve() in path.resolve().parents]
+    if changed:
+        names = ", ".join(path.name for path in changed[:5]) + (", ..." if len(changed) > 5 else "")
+        st.toast(f"🔄 {len(changed)} file(s) updated: {names}")
+    st.session_state["files_version"] = watcher.version
+    
+    # Check Generated Files Button; a click inside the fragment reruns only the fragment
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col2:
+            st.button("🔄 Check Generated Files", type="secondary", use_container_width=True)
+    
+    # Show Generated Files
+    st.markdown("""
+    <div class="content-section">
+            <h3 class="section-title">📁 Available Files</h3>
+    </div>
+    """, unsafe_allow_html=True)
     
-    # Create agents and tasks
-    agents = create_agents()
-    tasks = create_tasks(agents, pdf_content)
+    render_generated_files(output_root, watcher.version if watcher.available else None)
+
+def render_analysis_results(run, run_id):
+    """Render a finished run from the run cache without touching the crew"""
+    pdf_preview = run["pdf_preview"]
     
-    # Build the crew
-    crew = Crew(
-        agents=agents,
-        tasks=tasks,
-        process=Process.sequential
-    )
+    if pdf_preview.startswith("Warning"):
+        st.markdown(f"""
+        <div class="status-message status-warning">
+                ⚠️ <strong>Warning:</strong> {pdf_preview}
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with st.expander("📄 PDF Content Preview", expanded=False):
+            st.text_area("PDF Text", pdf_preview, height=300, disabled=True)
+            if run["pdf_chars"] > len(pdf_preview):
+                st.caption(f"Showing the first {len(pdf_preview):,} of {run['pdf_chars']:,} characters")
+    
+    if "incremental" in run:
+        incremental = run["incremental"]
+        carried = [task for task in incremental["tasks"] if task[1] == "carried"]
+        pages = ", ".join(str(number) for number in incremental["changed_pages"]) or "none"
+        with st.expander(
+            f"🔁 Incremental re-analysis of {incremental['previous']}: "
+            f"{len(carried)} of {len(incremental['tasks'])} tasks carried forward",
+            expanded=False
+        ):
+            st.caption(f"Changed pages: {pages}; pages removed: {incremental['removed_pages']}")
+            for key, action, reason in incremental["tasks"]:
+                icon = "⏭️ skipped" if action == "carried" else "🔄 re-run"
+                st.markdown(f"- **{key}** {icon}: {reason}")
+    
+    if "digest" in run:
+        digest = run["digest"]
+        saved = 1 - digest["digest_tokens"] / max(digest["original_tokens"], 1)
+        st.caption(
+            f"📉 Document digest: ~{digest['digest_tokens']:,} tokens instead of ~{digest['original_tokens']:,} "
+            f"({saved:.0%} smaller, condensed from {digest['chunks']} chunks)"
+        )
+    
+    # Success Message
+    st.markdown("""
+    <div class="status-message status-success">
+        ✅ <strong>Analysis Complete!</strong><br>
+        Your document has been successfully analyzed by our AI agents.
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Analysis Results
+    st.markdown("""
+    <div class="content-section">
+        <h3 class="section-title">📊 Analysis Results</h3>
+            <p style="text-align: center; color: #64748b; margin-bottom: 1.5rem;">
+                Comprehensive insights and recommendations from our AI analysis
+            </p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown(run["result"])
     
-    # Run the analysis
-    result = crew.kickoff()
-    return result
+    # File Check Section
+    st.markdown("""
+    <div class="content-section">
+            <h3 class="section-title">🔄 Generated Files</h3>
+            <p style="text-align: center; color: #64748b; margin-bottom: 1.5rem;">
+                Check and download the files generated by our AI agents
+            </p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    render_files_panel(run_output_dir(run_id))
+
+@st.cache_resource(show_spinner=False)
+def get_content_cache():
+    """File contents of every output folder, within one FILE_INDEX_CACHE_MB budget per process"""
+    return ContentCache()
+
+@st.cache_resource(show_spinner=False, max_entries=FILE_INDEX_ENTRIES)
+def get_file_index(folder):
+    """Index of one output folder, kept across reruns so unchanged files are not read again"""
+    return FileIndex(folder, safe_read_file, get_content_cache())
+
+def format_size(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024 or unit == "MB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+def file_icon(file):
+    return {".md": "📄", ".py": "🐍"}.get(file.path.suffix, "📁")
+
+def render_file(file, index):
+    """Render one selected file, FILE_PAGE_CHARS at a time, plus a download button"""
+    try:
+        content = index.read(file)
+    except Exception as e:
+        st.error(f"❌ Error reading {file.path.name}: {str(e)}")
+        return
+    if content.startswith("Error reading file"):
+        st.error(content)
+        return
+    
+    # Only the pages the user asked for are sent to the browser
+    pages_key = f"file_pages:{file.path}"
+    pages = st.session_state.get(pages_key, 1)
+    shown = content[:pages * FILE_PAGE_CHARS]
+    
+    suffix = file.path.suffix
+    if suffix == '.md':
+        st.markdown(shown)
+    elif suffix in ['.py', '.json', '.yaml', '.yml']:
+        st.code(shown, language=suffix[1:])  # Remove the dot
+    else:
+        st.text_area("File Content", shown, height=200, disabled=True)
+    
+    if len(shown) < len(content):
+        st.caption(f"Showing the first {len(shown):,} of {len(content):,} characters")
+        st.button(
+            "⬇️ Load more",
+            key=f"load_more:{file.path}",
+            on_click=lambda: st.session_state.update({pages_key: pages + 1})
+        )
+    
+    st.download_button(
+        label=f"💾 Download {file.relative}",
+        data=content,
+        file_name=file.relative.name,
+        mime="text/markdown" if suffix == '.md' else "text/plain",
+        key=f"download:{file.path}"
+    )
+
+def render_download_all(output_root, version=None):
+    """Offer every output folder of a run as one zip, built on request"""
+    # The prepared zip is kept for the session, so reruns keep offering it until the files change
+    zip_key = f"output_zip:{output_root}"
+    prepared = st.session_state.get(zip_key)
+    if prepared is not None and prepared[0] != version:
+        prepared[1].close()
+        prepared = st.session_state[zip_key] = None
+    if st.button("📦 Prepare a zip of all files", use_container_width=True):
+        # The archive is streamed into a temporary file that moves to disk once it grows large
+        archive = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+        with st.spinner("📦 Compressing the generated files..."):
+            for chunk in iter_output_zip(base=output_root):
+                archive.write(chunk)
+        if prepared is not None:
+            prepared[1].close()
+        prepared = st.session_state[zip_key] = (version, archive)
+    if prepared is not None:
+        archive = prepared[1]
+        archive.seek(0)
+        # Streamlit keeps download payloads in memory; the API's /outputs.zip streams instead
+        st.download_button(
+            label="💾 Download all files (.zip)",
+            data=archive.read(),
+            file_name=f"outputs-{output_root.parent.name[:12]}.zip",
+            mime="application/zip",
+            use_container_width=True
+        )
 
-def wait_for_files_and_refresh():
-    """Wait for files to be generated and refresh the display"""
-    st.info("⏳ Waiting for files to be generated...")
+def render_generated_files(output_root, version=None):
+    """List a run's generated output files and render the one the user selects"""
+    files_found = False
+    for folder in OUTPUT_FOLDERS:
+        index = get_file_index(str(output_root / folder))
+        # One walk of the tree lists every file exactly once; none while the watcher saw no change
+        all_files, directories = index.listing(version)
+        
+        if all_files:
+            files_found = True
+            st.markdown(f"""
+                <div class="content-box">
+                    <h4 style="color: #1e293b; margin-bottom: 1rem; text-align: center;">
+                        📂 {folder.replace('_', ' ').title()}
+                    </h4>
+                """, unsafe_allow_html=True)
+            
+            # Metadata only; no file is read until it is selected
+            total_size = sum(file.size for file in all_files)
+            st.caption(f"{len(all_files)} files, {format_size(total_size)}")
+            selected = st.selectbox(
+                "Select a file to view",
+                [None] + all_files,
+                format_func=lambda file: "Select a file to view..." if file is None else
+                    f"{file_icon(file)} {file.relative} ({format_size(file.size)}, "
+                    f"modified {time.strftime('%Y-%m-%d %H:%M', time.localtime(file.mtime))})",
+                key=f"selected_file:{output_root / folder}",
+                label_visibility="collapsed"
+            )
+            if selected is not None:
+                render_file(selected, index)
+            
+            # Show folder structure for code_output
+            if folder == "code_output":
+                with st.expander("📂 Folder Structure", expanded=False):
+                    # Folders first, then files, from the same scan
+                    st.text("\n".join(
+                        [f"📁 {directory}/" for directory in directories] +
+                        [f"📄 {file.relative}" for file in all_files]
+                    ))
+            
+            st.markdown("</div>", unsafe_allow_html=True)
     
-    # Wait a bit for file operations to complete
-    time.sleep(2)
+    if files_found:
+        render_download_all(output_root, version)
     
-    # Force a rerun to refresh the display
-    st.rerun()
+    if not files_found:
+        st.markdown("""
+        <div class="message message-warning">
+            ⚠️ <strong>No Generated Files Found</strong><br>
+            The agents may still be processing. Click 'Check Generated Files' to refresh.
+        </div>
+        """, unsafe_allow_html=True)
+        st.info("💡 Generated files will appear here once the agents complete their tasks.")
 
 def main():
     st.set_page_config(
@@ -1281,6 +1642,15 @@ def main():
     )
     
     if uploaded_file is not None:
+        # Identify the run by document content so reruns reuse the same result
+        run_id = run_key(document_digest(uploaded_file.getvalue()), APP_PIPELINE)
+        run_cache = st.session_state.setdefault("run_cache", {})
+        if run_id not in run_cache:
+            stored_run = load_run_result(run_id)
+            if stored_run is not None:
+                run_cache[run_id] = stored_run
+        
+
         # Success Message
         st.markdown(f"""
         <div class="message message-success">
@@ -1319,7 +1689,7 @@ def main():
         with col3:
             st.markdown(f"""
             <div class="info-item">
-                <div class="info-value">Ready</div>
+                <div class="info-value">{"Analyzed" if run_id in run_cache else "Ready"}</div>
                 <div class="info-label">Status</div>
             </div>
             """, unsafe_allow_html=True)
@@ -1330,255 +1700,115 @@ def main():
         # Analysis Button
         col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
-            if st.button("🚀 Start AI Analysis", type="primary", use_container_width=True):
-                st.markdown("""
-                <h3 style="text-align: center; color: #1e293b; margin: 2rem 0 1.5rem 0; font-size: 1.5rem; font-weight: 700;">
-                    🤖 AI Analysis in Progress
-                </h3>
-                <div class="message message-info">
-                    Our AI agents are analyzing your PDF document. This may take a few minutes.
-                </div>
-                """, unsafe_allow_html=True)
-            
-            # Read PDF content
-            pdf_content = read_pdf_content(uploaded_file)
-            
-            if pdf_content.startswith("Error"):
-                st.markdown(f"""
-                <div class="status-message status-error">
-                        ❌ <strong>Error:</strong> {pdf_content}
-                </div>
-                """, unsafe_allow_html=True)
-                return
-            
-            if pdf_content.startswith("Warning"):
-                st.markdown(f"""
-                <div class="status-message status-warning">
-                        ⚠️ <strong>Warning:</strong> {pdf_content}
-                </div>
-                """, unsafe_allow_html=True)
-            
-
+            # Offer to continue an interrupted run of this document
+            resume = True
+            saved_tasks = RunCheckpoint(run_id).completed() if run_id not in run_cache else []
+            if saved_tasks:
+                resume = st.checkbox(
+                    f"♻️ Resume the interrupted run ({len(saved_tasks)} completed tasks saved)",
+                    value=True
+                )
             
-            with st.expander("📄 PDF Content Preview", expanded=False):
-                    st.text_area("PDF Text", pdf_content, height=300, disabled=True)
+            # An earlier version of this document lends the new run its digest notes and, when
+            # the overview every task builds on is unchanged, the outputs of unaffected tasks
+            previous_version = None
+            previous_run_id = None
+            if run_id not in run_cache and not saved_tasks:
+                previous_version = find_previous_version(uploaded_file.name, exclude_run_id=run_id)
+                if previous_version is not None:
+                    previous = load_document_manifest(previous_version)
+                    # A similar file name is not enough; the two versions must actually share pages
+                    try:
+                        hashes, overview = pdf_fingerprints(uploaded_file, run_id)
+                        revision = is_revision(previous["page_hashes"], hashes)
+                    except Exception:
+                        # An unreadable PDF is reported once the analysis starts
+                        revision = False
+                    if not revision:
+                        previous_version = None
+                # Every task reads project_context, so once the overview changed none can be carried forward
+                if previous_version is not None and previous.get("overview") == overview:
+                    previous_name = previous["file_name"]
+                    if st.checkbox(
+                        f"🔁 Re-run only the tasks affected by changes since {previous_name}",
+                        value=True
+                    ):
+                        previous_run_id = previous_version
             
-            # Run CrewAI analysis
-            try:
-                with st.spinner("🤖 AI Agents are working on your document..."):
-                    result = run_crew_analysis(pdf_content)
-                
-                # Success Message
-                st.markdown("""
-                <div class="status-message status-success">
-                    ✅ <strong>Analysis Complete!</strong><br>
-                    Your document has been successfully analyzed by our AI agents.
-                </div>
-                """, unsafe_allow_html=True)
-                
-                    # Analysis Results
-                st.markdown("""
-                <div class="content-section">
-                    <h3 class="section-title">📊 Analysis Results</h3>
-                        <p style="text-align: center; color: #64748b; margin-bottom: 1.5rem;">
-                            Comprehensive insights and recommendations from our AI analysis
-                        </p>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                st.markdown(result)
-                
-                    # File Check Section
-                st.markdown("""
-                <div class="content-section">
-                        <h3 class="section-title">🔄 Generated Files</h3>
-                        <p style="text-align: center; color: #64748b; margin-bottom: 1.5rem;">
-                            Check and download the files generated by our AI agents
-                        </p>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Check Generated Files Button
-                col1, col2, col3 = st.columns([1, 2, 1])
-                with col2:
-                        if st.button("🔄 Check Generated Files", type="secondary", use_container_width=True):
-                            wait_for_files_and_refresh()
-                
-                    # Show Generated Files
-                st.markdown("""
-                <div class="content-section">
-                        <h3 class="section-title">📁 Available Files</h3>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Check for generated files
-                output_folders = ["project_analysis_output", "resource_output", "code_output"]
-                
-                files_found = False
-                for folder in output_folders:
-                    folder_path = Path(folder)
-                    if folder_path.exists():
-                        # Get all markdown files in the main folder
-                        main_files = list(folder_path.glob("*.md"))
-                        
-                        # Get all markdown files in subfolders (recursive)
-                        subfolder_files = list(folder_path.rglob("*.md"))
-                        
-                        # Get all Python files in subfolders (recursive)
-                        python_files = list(folder_path.rglob("*.py"))
-                        
-                        # Get all other common file types
-                        other_files = list(folder_path.rglob("*.txt")) + list(folder_path.rglob("*.yaml")) + list(folder_path.rglob("*.yml"))
-                        
-                        # Combine all files
-                        all_files = main_files + subfolder_files + python_files + other_files
-                        
-                        if all_files:
-                            files_found = True
-                            st.markdown(f"""
-                                <div class="content-box">
-                                    <h4 style="color: #1e293b; margin-bottom: 1rem; text-align: center;">
-                                        📂 {folder.replace('_', ' ').title()}
-                                    </h4>
-                                """, unsafe_allow_html=True)
-                            
-                            # Group files by type for better organization
-                            md_files = [f for f in all_files if f.suffix == '.md']
-                            py_files = [f for f in all_files if f.suffix == '.py']
-                            other_file_types = [f for f in all_files if f.suffix not in ['.md', '.py']]
-                            
-                            # Show markdown files first
-                            if md_files:
-                                    st.markdown("**📄 Markdown Files:**")
-                                    for file in md_files:
-                                        try:
-                                            # Use safe file reading
-                                            content = safe_read_file(file)
-                                            
-                                            # Show relative path for better organization
-                                            relative_path = file.relative_to(folder_path)
-                                            
-                                            with st.expander(f"📄 {relative_path}", expanded=False):
-                                                if content.startswith("Error reading file"):
-                                                    st.error(content)
-                                                else:
-                                                    st.markdown(content)
-                                            
-                                            # Download button for each file
-                                            if not content.startswith("Error"):
-                                                st.download_button(
-                                                    label=f"💾 Download {relative_path}",
-                                                    data=content,
-                                                    file_name=relative_path.name,
-                                                    mime="text/markdown"
-                                                )
-                                        except Exception as e:
-                                            st.error(f"❌ Error reading {file.name}: {str(e)}")
-                                
-                            # Show Python files
-                            if py_files:
-                                st.markdown("**🐍 Python Files:**")
-                                for file in py_files:
-                                    try:
-                                        # Use safe file reading
-                                        content = safe_read_file(file)
-                                        
-                                        # Show relative path for better organization
-                                        relative_path = file.relative_to(folder_path)
-                                        
-                                        with st.expander(f"🐍 {relative_path}", expanded=False):
-                                            if content.startswith("Error reading file"):
-                                                st.error(content)
-                                            else:
-                                                    st.code(content, language=relative_path.suffix[1:])
-                                        
-                                        # Download button for each file
-                                        if not content.startswith("Error"):
-                                            st.download_button(
-                                                label=f"💾 Download {relative_path}",
-                                                data=content,
-                                                file_name=relative_path.name,
-                                                mime="text/plain"
-                                            )
-                                    except Exception as e:
-                                        st.error(f"❌ Error reading {file.name}: {str(e)}")
-                            
-                            # Show other file types
-                            if other_file_types:
-                                st.markdown("**📁 Other Files:**")
-                                for file in other_file_types:
-                                    try:
-                                        # Use safe file reading
-                                        content = safe_read_file(file)
-                                        
-                                        # Show relative path for better organization
-                                        relative_path = file.relative_to(folder_path)
-                                        
-                                        # Determine file type for display
-                                        if file.suffix in ['.json', '.yaml', '.yml']:
-                                            with st.expander(f"📁 {relative_path}", expanded=False):
-                                                if content.startswith("Error reading file"):
-                                                    st.error(content)
-                                                else:
-                                                    st.code(content, language=file.suffix[1:])  # Remove the dot
-                                        else:
-                                            with st.expander(f"📁 {relative_path}", expanded=False):
-                                                if content.startswith("Error reading file"):
-                                                    st.error(content)
-                                                else:
-                                                    st.text_area("File Content", content, height=200, disabled=True)
-                                        
-                                        # Download button for each file
-                                        if not content.startswith("Error"):
-                                            st.download_button(
-                                                label=f"💾 Download {relative_path}",
-                                                data=content,
-                                                file_name=relative_path.name,
-                                                mime="text/plain"
-                                            )
-                                    except Exception as e:
-                                        st.error(f"❌ Error reading {file.name}: {str(e)}")
-                            
-                            # Show folder structure for code_output
-                            if folder == "code_output":
-                                st.markdown("**📂 Folder Structure:**")
-                                try:
-                                    # Get all directories and files recursively
-                                    all_items = []
-                                    for item in folder_path.rglob("*"):
-                                        if item.is_file():
-                                            all_items.append(f"📄 {item.relative_to(folder_path)}")
-                                        elif item.is_dir():
-                                            all_items.append(f"📁 {item.relative_to(folder_path)}/")
-                                    
-                                    # Sort items (folders first, then files)
-                                    all_items.sort(key=lambda x: (x.startswith("📁"), x))
-                                    
-                                    # Display in a nice format
-                                    for item in all_items:
-                                        st.write(f"  {item}")
-                                    
-                                except Exception as e:
-                                    st.error(f"❌ Error reading folder structure: {str(e)}")
-                                
-                                st.markdown("</div>", unsafe_allow_html=True)
-                
-                if not files_found:
+            if st.button("🚀 Start AI Analysis", type="primary", use_container_width=True):
+                if run_id in run_cache:
+                    st.info("♻️ This document was already analyzed - showing the stored results.")
+                else:
                     st.markdown("""
-                    <div class="message message-warning">
-                        ⚠️ <strong>No Generated Files Found</strong><br>
-                        The agents may still be processing. Click 'Check Generated Files' to refresh.
+                    <h3 style="text-align: center; color: #1e293b; margin: 2rem 0 1.5rem 0; font-size: 1.5rem; font-weight: 700;">
+                        🤖 AI Analysis in Progress
+                    </h3>
+                    <div class="message message-info">
+                        Our AI agents are analyzing your PDF document. This may take a few minutes.
                     </div>
                     """, unsafe_allow_html=True)
-                    st.info("💡 Generated files will appear here once the agents complete their tasks.")
-                
-            except Exception as e:
-                st.markdown(f"""
-                <div class="status-message status-error">
-                    ❌ <strong>Error during analysis:</strong> {str(e)}
-                </div>
-                """, unsafe_allow_html=True)
-                st.info("💡 Make sure your API keys are properly configured in the .env file")
+                    
+                    # Read PDF content; the same pass fingerprints every page
+                    try:
+                        document, hashes = read_pdf_document(uploaded_file)
+                    except Exception as e:
+                        st.markdown(f"""
+                        <div class="status-message status-error">
+                                ❌ <strong>Error:</strong> Error reading PDF: {str(e)}
+                        </div>
+                        """, unsafe_allow_html=True)
+                        return
+                    
+                    # Remember this version page by page so a later revision can be diffed against it
+                    save_document_manifest(run_id, uploaded_file.name, hashes, overview_fingerprint(document.chunks))
+                    
+                    # Run CrewAI analysis
+                    try:
+                        with claim_run(run_id):
+                            with st.spinner("📚 Preparing the document for the agents..."):
+                                prepare_document_context(
+                                    document, run_id, resume, previous_version, carry_forward=previous_run_id is not None
+                                )
+                            with st.spinner("🤖 AI Agents are working on your document..."):
+                                result, report = run_crew_analysis(
+                                    document, run_id, resume=resume, previous_run_id=previous_run_id
+                                )
+                    except Exception as e:
+                        st.markdown(f"""
+                        <div class="status-message status-error">
+                            ❌ <strong>Error during analysis:</strong> {str(e)}
+                        </div>
+                        """, unsafe_allow_html=True)
+                        st.info("💡 Make sure your API keys are properly configured in the .env file")
+                        return
+                    
+                    # Store the run so later reruns only re-render it
+                    run = {
+                        "pdf_preview": document.preview(PREVIEW_CHARS),
+                        "pdf_chars": len(document),
+                        "result": str(result),
+                    }
+                    if document.digest_report is not None:
+                        run["digest"] = {
+                            "original_tokens": document.digest_report.original_tokens,
+                            "digest_tokens": document.digest_report.digest_tokens,
+                            "chunks": document.digest_report.chunks,
+                        }
+                    if previous_run_id is not None:
+                        previous = load_document_manifest(previous_run_id)
+                        changed, removed = diff_pages(previous["page_hashes"], hashes)
+                        run["incremental"] = {
+                            "previous": previous["file_name"],
+                            "changed_pages": changed,
+                            "removed_pages": removed,
+                            "tasks": report,
+                        }
+                    run_cache[run_id] = run
+                    save_run_result(run_id, run)
+            
+            # Show results of the run for this document, if there is one
+            if run_id in run_cache:
+                render_analysis_results(run_cache[run_id], run_id)
     
     # Close the main container
     st.markdown("</div>", unsafe_allow_html=True)
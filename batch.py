@@ -0,0 +1,190 @@
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+# Documents analysed at the same time, one worker process each
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "2"))
+
+# LLM requests per minute across all workers; 0 means no limit
+BATCH_RATE_LIMIT = float(os.getenv("BATCH_RATE_LIMIT", "0"))
+
+
+def find_documents(source: Path):
+    """PDFs to analyse: every PDF under a directory, or the paths listed in a manifest.
+
+    A manifest is a JSON list of paths or a text file with one path per
+    line; relative paths are taken relative to the manifest.
+    """
+    if source.is_dir():
+        return sorted(source.rglob("*.pdf"))
+    text = source.read_text(encoding="utf-8")
+    if source.suffix == ".json":
+        entries = json.loads(text)
+    else:
+        entries = [line.strip() for line in text.splitlines() if line.strip() and not line.startswith("#")]
+    return [path if path.is_absolute() else source.parent / path for path in map(Path, entries)]
+
+
+def _init_worker(rate_limit, lock, next_slot):
+    if rate_limit > 0:
+        from llm_cache import RequestRateLimiter, set_rate_limiter
+
+        set_rate_limiter(RequestRateLimiter(rate_limit, lock, next_slot))
+
+
+def dedupe_documents(documents):
+    """Split documents into ``(unique, duplicates)`` by content.
+
+    ``unique`` maps each run id to the first path with that content;
+    ``duplicates`` lists ``(path, run_id)`` for the identical copies, which
+    would otherwise run at the same time in one run folder.
+    """
+    from pdf_extraction import source_digest
+    from run_store import CREW_PIPELINE, run_key
+
+    unique, duplicates = {}, []
+    for path in documents:
+        run_id = run_key(source_digest(str(path)), CREW_PIPELINE)
+        if run_id in unique:
+            duplicates.append((path, run_id))
+        else:
+            unique[run_id] = path
+    return unique, duplicates
+
+
+def _analyze(pdf_path: str, resume: bool) -> dict:
+    """Run one document; never raises, so one bad submission cannot stop the batch"""
+    started = time.perf_counter()
+    tokens = {"input": 0, "output": 0}
+
+    def on_event(event):
+        if event["event"] == "task_completed":
+            tokens["input"] += event["estimated_input_tokens"]
+            tokens["output"] += event["estimated_output_tokens"]
+
+    outcome = {"path": pdf_path, "run_id": None, "error": None}
+    try:
+        from crew_test import build_crew, run_crew
+        from run_store import run_output_dir
+
+        crew, run_id = build_crew(pdf_path, resume=resume)
+        outcome["run_id"] = run_id
+        # Old runs are left alone; a large batch would otherwise delete its own earlier documents.
+        # The batch's runs are marked retained before they start, so no other run collects them either.
+        result = run_crew(crew, run_id, resume=resume, on_event=on_event, collect_garbage=False)
+        (run_output_dir(run_id) / "final_report.md").write_text(str(result), encoding="utf-8")
+    except Exception as e:
+        outcome["error"] = f"{type(e).__name__}: {e}"
+    outcome["seconds"] = time.perf_counter() - started
+    outcome["tokens"] = tokens
+    return outcome
+
+
+def percentile(values, fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(outcomes, wall_seconds: float) -> dict:
+    duplicates = [outcome for outcome in outcomes if outcome.get("duplicate_of")]
+    outcomes = [outcome for outcome in outcomes if not outcome.get("duplicate_of")]
+    succeeded = [outcome for outcome in outcomes if outcome["error"] is None]
+    seconds = [outcome["seconds"] for outcome in succeeded]
+    return {
+        "documents": len(outcomes),
+        "succeeded": len(succeeded),
+        "failed": len(outcomes) - len(succeeded),
+        "duplicates": len(duplicates),
+        "wall_seconds": round(wall_seconds, 1),
+        "docs_per_hour": round(len(succeeded) / wall_seconds * 3600, 1) if wall_seconds else 0.0,
+        "p50_seconds": round(percentile(seconds, 0.50), 1) if seconds else None,
+        "p95_seconds": round(percentile(seconds, 0.95), 1) if seconds else None,
+        "estimated_input_tokens": sum(outcome["tokens"]["input"] for outcome in outcomes),
+        "estimated_output_tokens": sum(outcome["tokens"]["output"] for outcome in outcomes),
+    }
+
+
+def run_batch(documents, concurrency: int = BATCH_CONCURRENCY, rate_limit: float = BATCH_RATE_LIMIT,
+              resume: bool = True):
+    """Analyse documents across a process pool; returns (outcomes, summary).
+
+    Identical submissions are analysed once; their copies are reported with
+    ``duplicate_of`` and the shared run id. Every run of the batch is
+    exempted from run retention, so later app or API runs never delete its
+    reports.
+    """
+    from run_store import retain_run
+
+    started = time.perf_counter()
+    unique, duplicates = dedupe_documents(documents)
+    for run_id in unique:
+        retain_run(run_id)
+    outcomes = [
+        {"path": str(path), "run_id": run_id, "error": None, "duplicate_of": str(unique[run_id]),
+         "seconds": 0.0, "tokens": {"input": 0, "output": 0}}
+        for path, run_id in duplicates
+    ]
+    for outcome in outcomes:
+        print(f"Skipping {outcome['path']}: identical to {outcome['duplicate_of']}", flush=True)
+    lock = multiprocessing.Lock()
+    next_slot = multiprocessing.Value("d", 0.0, lock=False)
+    with ProcessPoolExecutor(
+        max_workers=max(1, concurrency),
+        initializer=_init_worker,
+        initargs=(rate_limit, lock, next_slot),
+    ) as pool:
+        futures = [pool.submit(_analyze, str(path), resume) for path in unique.values()]
+        for done, future in enumerate(as_completed(futures), start=1):
+            outcome = future.result()
+            outcomes.append(outcome)
+            status = "failed: " + outcome["error"] if outcome["error"] else "done"
+            print(f"[{done}/{len(futures)}] {outcome['path']} {status} in {outcome['seconds']:.0f}s", flush=True)
+    return outcomes, summarize(outcomes, time.perf_counter() - started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Analyse a directory or manifest of PDFs without the UI. Each document runs in its own "
+                    "worker process and writes into runs/<run_id>/outputs/, including final_report.md."
+    )
+    parser.add_argument("source", type=Path, help="directory of PDFs, or a .txt/.json manifest of paths")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY,
+                        help="documents analysed at the same time")
+    parser.add_argument("--rate-limit", type=float, default=BATCH_RATE_LIMIT,
+                        help="LLM requests per minute across all workers (0 for no limit)")
+    parser.add_argument("--no-resume", action="store_true", help="ignore checkpoints of earlier attempts")
+    parser.add_argument("--summary", type=Path, help="also write the per-document results and summary as JSON")
+    args = parser.parse_args(argv)
+
+    documents = find_documents(args.source)
+    missing = [path for path in documents if not path.is_file()]
+    if missing:
+        parser.error(f"{len(missing)} listed PDFs do not exist, e.g. {missing[0]}")
+    if not documents:
+        parser.error(f"No PDFs found in {args.source}")
+
+    print(f"Analysing {len(documents)} documents, {args.concurrency} at a time")
+    outcomes, summary = run_batch(documents, args.concurrency, args.rate_limit, resume=not args.no_resume)
+
+    print("\n" + "=" * 50)
+    print(f"Documents: {summary['succeeded']} succeeded, {summary['failed']} failed, "
+          f"{summary['duplicates']} duplicates skipped in {summary['wall_seconds']:,.0f}s")
+    print(f"Throughput: {summary['docs_per_hour']:,.1f} docs/hour")
+    if summary["p50_seconds"] is not None:
+        print(f"Per document: p50 {summary['p50_seconds']:,.0f}s, p95 {summary['p95_seconds']:,.0f}s")
+    print(f"Tokens (estimated, task prompts and outputs only): {summary['estimated_input_tokens']:,} in, "
+          f"{summary['estimated_output_tokens']:,} out")
+    if args.summary:
+        args.summary.write_text(json.dumps({"summary": summary, "documents": outcomes}, indent=2), encoding="utf-8")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+import math
+import re
+from collections import Counter
+
+from pdf_extraction import iter_chunks
+
+# Size of the passages the document is split into for excerpt lookup
+CONTEXT_CHUNK_CHARS = 2000
+
+# Passages handed to a task that only needs part of the document
+DEFAULT_EXCERPTS = 4
+
+# What each task that only needs part of the document looks for in it
+EXCERPT_QUERIES = {
+    "objectives": "goals objectives scope success acceptance criteria phases milestones deliverables users",
+    "technical": "technology stack architecture platform api integration requirements constraints performance security skills",
+    "resources": "datasets data apis services tools infrastructure hosting budget cost team resources licensing",
+}
+
+# Joins the passages of one excerpt
+_EXCERPT_SEPARATOR = "\n...\n"
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#.-]*")
+
+
+def _terms(text: str):
+    return _WORD.findall(text.lower())
+
+
+class DocumentContext:
+    """Per-run store of the analysed document.
+
+    The document is ingested once; tasks reference it through
+    ``overview()`` (only the task that reads the whole document) or
+    ``excerpts()`` (tasks that only need the passages relevant to them)
+    instead of each embedding a copy of the full text in its prompt.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+        self._chunk_terms = [Counter(_terms(chunk)) for chunk in self.chunks]
+        # Set by the digest stage when the document is too long to pass whole
+        self.digest_report = None
+        # Retrieval index over self.chunks; keyword scoring is used without one
+        self.index = None
+        # Excerpts already handed out, by "<k>:<query>"; saved with a run so its later attempts get the same ones
+        self.pinned_excerpts = {}
+
+    @classmethod
+    def from_text(cls, text: str, chunk_chars: int = CONTEXT_CHUNK_CHARS):
+        return cls(iter_chunks([text], chunk_chars))
+
+    @classmethod
+    def from_pages(cls, pages, chunk_chars: int = CONTEXT_CHUNK_CHARS):
+        return cls(iter_chunks(pages, chunk_chars))
+
+    def full_text(self) -> str:
+        return "".join(self.chunks)
+
+    def overview(self) -> str:
+        """The structured digest when one was built, otherwise the full text"""
+        if self.digest_report is not None:
+            return self.digest_report.digest
+        return self.full_text()
+
+    def preview(self, max_chars: int) -> str:
+        """The first ``max_chars`` characters, without joining the whole document"""
+        parts, size = [], 0
+        for chunk in self.chunks:
+            if size >= max_chars:
+                break
+            parts.append(chunk[:max_chars - size])
+            size += len(parts[-1])
+        return "".join(parts)
+
+    def has_text(self) -> bool:
+        return any(chunk.strip() for chunk in self.chunks)
+
+    def __len__(self):
+        return sum(len(chunk) for chunk in self.chunks)
+
+    def needs_retrieval(self, k: int = DEFAULT_EXCERPTS) -> bool:
+        """Whether excerpts are a strict subset of the document, i.e. an index would help"""
+        return len(self.chunks) > k
+
+    def pin_excerpts(self, excerpts):
+        """Hand out earlier excerpts again, e.g. those saved with a run, where they are passages of this document"""
+        chunks = set(self.chunks)
+        for pin, excerpt in excerpts.items():
+            if all(part in chunks for part in excerpt.split(_EXCERPT_SEPARATOR)):
+                self.pinned_excerpts[pin] = excerpt
+
+    def has_pinned(self, queries, k: int = DEFAULT_EXCERPTS) -> bool:
+        """Whether the excerpts of every query are pinned, i.e. an index would go unused"""
+        return all(f"{k}:{query}" in self.pinned_excerpts for query in queries)
+
+    def excerpts(self, query: str, k: int = DEFAULT_EXCERPTS) -> str:
+        """Return the ``k`` passages most relevant to ``query``, in document order"""
+        if not self.needs_retrieval(k):
+            return self.full_text()
+        pin = f"{k}:{query}"
+        if pin in self.pinned_excerpts:
+            return self.pinned_excerpts[pin]
+
+        best = None
+        if self.index is not None:
+            try:
+                best = self.index.query(query, k)
+            except Exception:
+                # A failed embedding request should cost relevance, not the run
+                best = None
+        if not best:
+            best = self._keyword_matches(query, k)
+        self.pinned_excerpts[pin] = _EXCERPT_SEPARATOR.join(self.chunks[i] for i in sorted(best))
+        return self.pinned_excerpts[pin]
+
+    def _keyword_matches(self, query: str, k: int):
+        query_terms = set(_terms(query))
+        scores = []
+        for index, terms in enumerate(self._chunk_terms):
+            length = sum(terms.values()) or 1
+            hits = sum(terms[term] for term in query_terms)
+            scores.append((hits / math.sqrt(length), -index))
+        return sorted(range(len(self.chunks)), key=lambda i: scores[i], reverse=True)[:k]
@@ -0,0 +1,257 @@
+import functools
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+
+from pdf_extraction import PageText, iter_chunks, text_fingerprint
+from run_store import load_run_file, save_run_file
+
+# Documents up to this size go to the crew as-is; larger ones are digested first
+DIGEST_TRIGGER_TOKENS = int(os.getenv("DIGEST_TRIGGER_TOKENS", "12000"))
+
+# Token budget of each chunk sent to the map step
+DIGEST_CHUNK_TOKENS = int(os.getenv("DIGEST_CHUNK_TOKENS", "3000"))
+
+# Average number of lines between the content-picked cuts of the map step's chunks
+DIGEST_BOUNDARY_LINES = int(os.getenv("DIGEST_BOUNDARY_LINES", "100"))
+
+# Concurrent summarisation requests against the OpenAI-compatible endpoint
+DIGEST_CONCURRENCY = int(os.getenv("DIGEST_CONCURRENCY", "4"))
+
+# Reduce rounds before the remaining notes are merged in one request regardless of size
+DIGEST_MAX_REDUCE_ROUNDS = int(os.getenv("DIGEST_MAX_REDUCE_ROUNDS", "3"))
+
+# Rough characters-per-token ratio used when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
+
+# Sections of the structured digest handed to the crew
+DIGEST_SECTIONS = [
+    "Project Name",
+    "Summary",
+    "Objectives",
+    "Requirements",
+    "Technology Stack",
+    "Constraints and Limitations",
+    "Dependencies",
+    "Risks and Mitigations",
+    "Timeline and Milestones",
+    "Team and Roles",
+    "Budget and Resources",
+]
+
+_MAP_PROMPT = (
+    "You are condensing one part of a project document. Extract every concrete fact "
+    "(names, requirements, technologies, numbers, dates, people, budgets, risks) and drop filler. "
+    "Use terse bullet points and keep the document's own wording for names and figures."
+)
+
+_REDUCE_PROMPT = (
+    "You are merging condensed notes from consecutive parts of one project document into a single "
+    "structured digest. Use exactly these Markdown sections, in this order: {sections}. Keep every "
+    "concrete fact, merge duplicates, and write 'Not stated' for a section the notes do not cover."
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # tiktoken is optional and its encoding files may not be reachable offline
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """Count tokens with tiktoken when available, otherwise estimate from length"""
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def create_digest_llm(model: str):
+    """Build the LLM used for the digest, pointed at the configured OpenAI-compatible endpoint"""
+    from llm_cache import CachedLLM
+
+    return CachedLLM(
+        model=model,
+        base_url=os.getenv("OPENAI_API_BASE"),
+        api_key=os.getenv("OPENAI_API_KEY"),
+        temperature=0,
+    )
+
+
+@dataclass
+class DigestReport:
+    """Outcome of the digest stage and how much it shrank the document"""
+    digest: str
+    original_tokens: int
+    digest_tokens: int
+    chunks: int
+    # Results of the map and reduce requests by fingerprint of their input, for a later digest to reuse
+    notes: dict = field(default_factory=dict, repr=False)
+
+    @property
+    def savings(self) -> float:
+        if not self.original_tokens:
+            return 0.0
+        return 1 - self.digest_tokens / self.original_tokens
+
+
+def _complete(llm, system_prompt: str, text: str) -> str:
+    return llm.call([
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": text},
+    ])
+
+
+def _iter_lines(text_chunks):
+    """Lines of a document handed over in chunks that may end mid-line"""
+    partial = ""
+    for text in text_chunks:
+        if isinstance(text, PageText):
+            text = text.text + "\n" if text.text else ""
+        lines = (partial + text).split("\n")
+        partial = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    if partial:
+        yield partial
+
+
+def _is_boundary(line: str) -> bool:
+    return bool(line.strip()) and int(text_fingerprint(line)[:8], 16) % max(1, DIGEST_BOUNDARY_LINES) == 0
+
+
+def digest_chunks(text_chunks, max_chars: int = DIGEST_CHUNK_TOKENS * CHARS_PER_TOKEN):
+    """Cut a document into the chunks condensed by the map step.
+
+    Chunks end after lines picked by their own text rather than by their
+    position, and only a chunk reaching ``max_chars`` is cut where it
+    stands; an edit therefore changes the chunks around it, not every
+    chunk after it.
+    """
+    buffer, size = [], 0
+    for line in _iter_lines(text_chunks):
+        if buffer and size + len(line) > max_chars:
+            yield "".join(buffer)
+            buffer, size = [], 0
+        # A line longer than a chunk is split across chunks
+        while len(line) > max_chars:
+            yield line[:max_chars]
+            line = line[max_chars:]
+        buffer.append(line)
+        size += len(line)
+        if _is_boundary(line):
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def _summarize_chunks(llm, chunks, max_workers: int):
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as pool:
+        return list(pool.map(lambda chunk: _complete(llm, _MAP_PROMPT, chunk), chunks))
+
+
+def _reduce(llm, summaries, max_workers: int, max_rounds: int = DIGEST_MAX_REDUCE_ROUNDS) -> str:
+    """Merge summaries into one digest, in rounds when they do not fit one request.
+
+    A round that does not shrink the number of groups (merged notes longer
+    than half a request) or reaching ``max_rounds`` ends the rounds; what is
+    left is then merged in one oversized request, so the number of calls
+    stays bounded.
+    """
+    reduce_prompt = _REDUCE_PROMPT.format(sections=", ".join(DIGEST_SECTIONS))
+    budget_chars = DIGEST_CHUNK_TOKENS * CHARS_PER_TOKEN
+    groups = list(iter_chunks(summaries, budget_chars))
+    for _ in range(max(0, max_rounds)):
+        if len(groups) == 1:
+            break
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(groups)))) as pool:
+            summaries = list(pool.map(lambda group: _complete(llm, reduce_prompt, group), groups))
+        merged = list(iter_chunks(summaries, budget_chars))
+        if len(merged) >= len(groups):
+            break
+        groups = merged
+    return _complete(llm, reduce_prompt, "\n".join(summaries) if len(groups) > 1 else groups[0])
+
+
+def _reduce_key(summaries) -> str:
+    return "reduce:" + hashlib.sha256(json.dumps(summaries).encode("utf-8")).hexdigest()
+
+
+def build_digest(text_chunks, llm, max_workers: int = DIGEST_CONCURRENCY, notes=None) -> DigestReport:
+    """Map-reduce a document into a compact structured digest.
+
+    ``text_chunks`` is any iterable of document text (pages or passages); it
+    is regrouped into ``digest_chunks`` of up to DIGEST_CHUNK_TOKENS tokens,
+    each chunk is condensed concurrently, and the notes are reduced into
+    one digest with the DIGEST_SECTIONS headings.
+
+    ``notes`` are those of an earlier digest, e.g. of a previous version of
+    the document: chunks condensed there are not condensed again, and the
+    same notes are not reduced again, so an unchanged document gets back
+    the same digest.
+    """
+    notes = dict(notes or {})
+    chunks = list(digest_chunks(text_chunks))
+    original_tokens = sum(estimate_tokens(chunk) for chunk in chunks)
+    keys = [text_fingerprint(chunk) for chunk in chunks]
+    missing = {key: chunk for key, chunk in zip(keys, chunks) if key not in notes}
+    notes.update(zip(missing, _summarize_chunks(llm, list(missing.values()), max_workers)))
+    summaries = [notes[key] for key in keys]
+    reduce_key = _reduce_key(summaries)
+    if reduce_key not in notes:
+        notes[reduce_key] = _reduce(llm, summaries, max_workers)
+    digest = notes[reduce_key]
+    return DigestReport(
+        digest=digest,
+        original_tokens=original_tokens,
+        digest_tokens=estimate_tokens(digest),
+        chunks=len(chunks),
+        # Only this digest's own notes, so they do not pile up from version to version
+        notes={key: notes[key] for key in [*keys, reduce_key]},
+    )
+
+
+def load_or_build_digest(text_chunks, llm, run_id: str, reuse: bool = True, previous_run_id: str = None,
+                         max_workers: int = DIGEST_CONCURRENCY) -> DigestReport:
+    """The digest saved with a run, or a new one that is saved for the run's later attempts.
+
+    A digest is not reproducible (each build makes new LLM calls), and it is
+    part of the prompts, so an interrupted run only resumes from its
+    checkpoints when it gets back the exact digest it started with. A new
+    digest reuses the notes of ``previous_run_id``'s, for the parts of the
+    document the two versions share.
+    """
+    saved = load_run_file(run_id, "digest.json") if reuse else None
+    if saved is not None:
+        return DigestReport(**saved)
+    previous = load_run_file(previous_run_id, "digest.json") if previous_run_id else None
+    report = build_digest(text_chunks, llm, max_workers, notes=(previous or {}).get("notes"))
+    save_run_file(run_id, "digest.json", asdict(report))
+    return report
+
+
+def needs_digest(text_chunks) -> bool:
+    """Whether a document is too large to hand to the crew without digesting it"""
+    return sum(estimate_tokens(chunk) for chunk in text_chunks) > DIGEST_TRIGGER_TOKENS
+
+
+def overview_fingerprint(text_chunks) -> str:
+    """Fingerprint of what a document's overview is made of: its digest chunks, or its text when it is not digested.
+
+    Two versions with the same fingerprint get the same overview, the
+    digest through its reused notes, so the tasks reading it can be carried
+    forward from one version to the other; any other edit changes it.
+    """
+    text_chunks = list(text_chunks)
+    if needs_digest(text_chunks):
+        payload = "\n".join(text_fingerprint(chunk) for chunk in digest_chunks(text_chunks))
+    else:
+        payload = "".join(text_chunks)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,89 @@
+import functools
+import hashlib
+import os
+
+# Chroma store for the per-run collections; kept apart from the repo's db/ store and never committed
+DOCUMENT_INDEX_PATH = os.getenv("DOCUMENT_INDEX_PATH", ".document_index")
+
+# "openai" embeds through the OpenAI-compatible endpoint, "local" uses sentence-transformers offline
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "openai")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+LOCAL_EMBEDDING_MODEL = os.getenv("LOCAL_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+_EMBEDDING_PROVIDERS = ("openai", "local")
+
+# Passages embedded per request
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+
+
+@functools.lru_cache(maxsize=1)
+def _client():
+    import chromadb
+
+    return chromadb.PersistentClient(path=DOCUMENT_INDEX_PATH)
+
+
+@functools.lru_cache(maxsize=1)
+def _embedding_function():
+    from chromadb.utils import embedding_functions
+
+    if EMBEDDING_PROVIDER == "local":
+        return embedding_functions.SentenceTransformerEmbeddingFunction(model_name=LOCAL_EMBEDDING_MODEL)
+    return embedding_functions.OpenAIEmbeddingFunction(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        api_base=os.getenv("OPENAI_API_BASE"),
+        model_name=EMBEDDING_MODEL,
+    )
+
+
+def _collection_name(run_id: str, provider: str = EMBEDDING_PROVIDER) -> str:
+    """Name a run's collection; Chroma caps names at 63 characters, so the run id is hashed"""
+    return f"run-{hashlib.sha256(run_id.encode('utf-8')).hexdigest()[:32]}-{provider}"
+
+
+def drop_index(run_id: str):
+    """Delete a run's collections, e.g. once the run itself was deleted"""
+    try:
+        client = _client()
+    except Exception:
+        # chromadb missing or the store unreadable: there is nothing this process could have built
+        return
+    for provider in _EMBEDDING_PROVIDERS:
+        try:
+            client.delete_collection(_collection_name(run_id, provider))
+        except Exception:
+            # Never built with this provider
+            continue
+
+
+class DocumentIndex:
+    """Per-run Chroma collection answering top-k passage lookups; dropped when the run is collected"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    @classmethod
+    def build(cls, chunks, run_id: str):
+        """Embed a document's passages into its run's collection, reusing one that is already complete"""
+        collection = _client().get_or_create_collection(
+            name=_collection_name(run_id),
+            embedding_function=_embedding_function(),
+        )
+        if collection.count() != len(chunks):
+            for start in range(0, len(chunks), EMBEDDING_BATCH_SIZE):
+                batch = chunks[start:start + EMBEDDING_BATCH_SIZE]
+                positions = range(start, start + len(batch))
+                collection.upsert(
+                    ids=[f"chunk-{position}" for position in positions],
+                    documents=batch,
+                    metadatas=[{"position": position} for position in positions],
+                )
+        return cls(collection)
+
+    def query(self, text: str, k: int):
+        """Return the positions of the ``k`` passages closest to ``text``"""
+        result = self.collection.query(
+            query_texts=[text],
+            n_results=min(k, self.collection.count()),
+            include=["metadatas"],
+        )
+        return [metadata["position"] for metadata in result["metadatas"][0]]
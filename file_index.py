@@ -0,0 +1,175 @@
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple
+
+# Folders the agents write their output into
+OUTPUT_FOLDERS = ["project_analysis_output", "resource_output", "code_output"]
+
+# Generated files listed in the files panel
+LISTED_SUFFIXES = {".md", ".py", ".txt", ".yaml", ".yml"}
+
+# File contents kept in memory between reruns, across every indexed folder
+FILE_INDEX_CACHE_BYTES = int(os.getenv("FILE_INDEX_CACHE_MB", "64")) * 1024 * 1024
+
+
+# Bytes handed to chardet when a file is not UTF-8
+ENCODING_SAMPLE_BYTES = 64 * 1024
+
+# Files from this size on are decoded from a memory map instead of a read buffer
+MMAP_MIN_BYTES = 8 * 1024 * 1024
+
+# Detected encodings by (path, mtime, size), so a file is only sniffed once per version
+_encodings = OrderedDict()
+_encodings_lock = threading.Lock()
+_ENCODING_CACHE_ENTRIES = 4096
+
+
+def _detect_encoding(data, position: int) -> str:
+    """Guess an encoding from a bounded sample around the first byte that is not UTF-8"""
+    import chardet
+
+    start = max(0, position - ENCODING_SAMPLE_BYTES // 2)
+    detected = chardet.detect(bytes(data[start:start + ENCODING_SAMPLE_BYTES]))
+    encoding = detected['encoding']
+    # A sample that looks like ASCII cannot explain a byte that failed UTF-8
+    if not encoding or encoding.lower() == 'ascii':
+        return 'latin-1'
+    return encoding
+
+
+def read_text(path) -> str:
+    """Read a text file in one pass, detecting its encoding when it is not UTF-8"""
+    stat = os.stat(path)
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    with open(path, 'rb') as f:
+        if stat.st_size >= MMAP_MIN_BYTES:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            data = f.read()
+    try:
+        with _encodings_lock:
+            encoding = _encodings.get(key)
+        if encoding is None:
+            try:
+                text = str(data, 'utf-8')
+                encoding = 'utf-8'
+            except UnicodeDecodeError as e:
+                encoding = _detect_encoding(data, e.start)
+                text = str(data, encoding, 'replace')
+            with _encodings_lock:
+                _encodings[key] = encoding
+                while len(_encodings) > _ENCODING_CACHE_ENTRIES:
+                    _encodings.popitem(last=False)
+        else:
+            text = str(data, encoding, 'replace')
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+    return text
+
+
+class FileEntry(NamedTuple):
+    path: Path
+    relative: Path
+    size: int
+    mtime: float
+
+
+class ContentCache:
+    """Least-recently-used file contents, bounded by their total size.
+
+    One instance can back any number of FileIndex objects, so the budget
+    holds for all of them together.
+    """
+
+    def __init__(self, max_bytes: int = FILE_INDEX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._contents = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, path, version):
+        """Cached content of ``path`` if it was stored for the same ``version``"""
+        with self._lock:
+            cached = self._contents.get(path)
+            if cached is None or cached[0] != version:
+                return None
+            self._contents.move_to_end(path)
+            return cached[1]
+
+    def put(self, path, version, content: str):
+        with self._lock:
+            previous = self._contents.pop(path, None)
+            if previous is not None:
+                self._cached_bytes -= len(previous[1])
+            self._contents[path] = (version, content)
+            self._cached_bytes += len(content)
+            while self._cached_bytes > self.max_bytes and len(self._contents) > 1:
+                _, (_, evicted) = self._contents.popitem(last=False)
+                self._cached_bytes -= len(evicted)
+
+
+class FileIndex:
+    """Listing of one output folder plus a cache of the file contents read from it.
+
+    ``scan()`` walks the tree once per call; ``read()`` only goes back to
+    disk for a file whose size or modification time changed since it was
+    last read. Pass a shared ``cache`` to bound the contents of several
+    indexes together.
+    """
+
+    def __init__(self, root, reader, cache: ContentCache = None):
+        self.root = Path(root)
+        self.reader = reader
+        self.cache = cache if cache is not None else ContentCache()
+        self._lock = threading.Lock()
+        self._listing = None
+
+    def scan(self):
+        """Return ``(files, directories)``: listed files sorted by path, and every subfolder"""
+        files, directories = [], []
+        if not self.root.is_dir():
+            return files, directories
+        pending = [self.root]
+        while pending:
+            directory = pending.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        path = Path(entry.path)
+                        if entry.is_dir(follow_symlinks=False):
+                            directories.append(path.relative_to(self.root))
+                            pending.append(path)
+                        elif entry.is_file() and path.suffix in LISTED_SUFFIXES:
+                            stat = entry.stat()
+                            files.append(FileEntry(path, path.relative_to(self.root), stat.st_size, stat.st_mtime))
+            except OSError:
+                # A folder removed mid-scan is simply not listed
+                continue
+        files.sort(key=lambda entry: entry.relative)
+        directories.sort()
+        return files, directories
+
+    def listing(self, version=None):
+        """``scan()``, reused while ``version`` (e.g. a file watcher's change counter) stays the same"""
+        if version is None:
+            return self.scan()
+        with self._lock:
+            if self._listing is not None and self._listing[0] == version:
+                return self._listing[1]
+        listing = self.scan()
+        with self._lock:
+            self._listing = (version, listing)
+        return listing
+
+    def read(self, entry: FileEntry) -> str:
+        """Content of a listed file, from the cache unless the file changed"""
+        version = (entry.size, entry.mtime)
+        content = self.cache.get(entry.path, version)
+        if content is None:
+            content = self.reader(entry.path)
+            self.cache.put(entry.path, version, content)
+        return content
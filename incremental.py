@@ -0,0 +1,100 @@
+import difflib
+import shutil
+from pathlib import Path
+
+from pdf_extraction import text_fingerprint
+from task_scheduler import prompt_fingerprint, task_dependencies, task_fingerprints, task_key, topological_order
+
+# Share of a new version's pages with text that must be unchanged for an earlier run to count as its previous version
+INCREMENTAL_MIN_SHARED_PAGES = 0.5
+
+
+def page_hash(text: str) -> str:
+    """Fingerprint a page's text, ignoring whitespace, so two versions of a document can be compared"""
+    return text_fingerprint(text)
+
+
+def page_hashes(pages):
+    return [page_hash(text) for text in pages]
+
+
+def diff_pages(old_hashes, new_hashes):
+    """Compare two versions page by page.
+
+    Returns ``(changed, removed)``: the 1-based numbers of new-version pages
+    that were edited or inserted, and how many old pages were deleted.
+    """
+    changed = []
+    removed = 0
+    matcher = difflib.SequenceMatcher(a=old_hashes, b=new_hashes, autojunk=False)
+    for op, old_start, old_stop, new_start, new_stop in matcher.get_opcodes():
+        if op == "equal":
+            continue
+        changed.extend(range(new_start + 1, new_stop + 1))
+        removed += max(0, (old_stop - old_start) - (new_stop - new_start))
+    return changed, removed
+
+
+def shared_pages(old_hashes, new_hashes) -> float:
+    """Share of the new version's pages with text that appear unchanged in the old one"""
+    blank = page_hash("")
+    matcher = difflib.SequenceMatcher(a=old_hashes, b=new_hashes, autojunk=False)
+    shared = sum(
+        1
+        for _, new_start, size in matcher.get_matching_blocks()
+        for page in new_hashes[new_start:new_start + size]
+        if page != blank
+    )
+    with_text = sum(1 for page in new_hashes if page != blank)
+    return shared / with_text if with_text else 0.0
+
+
+def is_revision(old_hashes, new_hashes) -> bool:
+    """Whether a document is plausibly a revision of another, not just one with a similar file name"""
+    return shared_pages(old_hashes, new_hashes) >= INCREMENTAL_MIN_SHARED_PAGES
+
+
+def seed_incremental_run(tasks, checkpoint, previous_checkpoint, output_root=None, previous_output_root=None):
+    """Carry forward the outputs of a previous version's run that are still valid.
+
+    A task is carried forward when the previous run completed it, its own
+    prompt, which embeds the document passages it reads, is unchanged, and
+    none of the tasks it reads from is re-run; i.e. when its full
+    fingerprint, upstream fingerprints included, still matches. Its output
+    is written to ``checkpoint`` under the new run's fingerprints, so
+    ``run_task_graph`` restores it instead of running it; every other task
+    runs as usual. When both output folders are given and at least one task
+    is carried forward, the previous run's files are copied into the new
+    one, so carried-forward tasks keep their files; re-run tasks overwrite
+    theirs.
+
+    Returns ``[(task_key, "carried" | "rerun", reason), ...]`` in task order.
+    """
+    dependencies = task_dependencies(tasks)
+    fingerprints = task_fingerprints(tasks, dependencies, output_root)
+    by_key = {task_key(task, position): task for position, task in enumerate(tasks)}
+    rerun = set()
+    decisions = {}
+    for key in topological_order(dependencies):
+        previous = previous_checkpoint.load_entry(key)
+        prompt = prompt_fingerprint(by_key[key], output_root)
+        rerun_upstream = [upstream for upstream in dependencies[key] if upstream in rerun]
+        if previous is None:
+            reason = "no output in the previous version"
+        elif previous.get("prompt_fingerprint") != prompt:
+            reason = "the document sections it reads changed"
+        elif rerun_upstream:
+            reason = f"re-running its inputs: {', '.join(rerun_upstream)}"
+        elif previous.get("fingerprint") != fingerprints[key]:
+            reason = "its inputs changed"
+        else:
+            checkpoint.save(key, fingerprints[key], previous["raw"], prompt)
+            decisions[key] = ("carried", "its document sections and inputs are unchanged")
+            continue
+        rerun.add(key)
+        decisions[key] = ("rerun", reason)
+    carried = len(rerun) < len(by_key)
+    if carried and output_root is not None and previous_output_root is not None \
+            and Path(previous_output_root).is_dir():
+        shutil.copytree(previous_output_root, output_root, dirs_exist_ok=True)
+    return [(key, *decisions[key]) for key in by_key]
@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Analyses running at the same time; further jobs wait in the queue
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+
+# Jobs waiting for a worker before new submissions are refused
+JOB_QUEUE_LIMIT = int(os.getenv("JOB_QUEUE_LIMIT", "20"))
+
+# Finished jobs kept for status and result lookups
+JOB_HISTORY = int(os.getenv("JOB_HISTORY", "100"))
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at JOB_QUEUE_LIMIT"""
+
+
+class Job:
+    """One submitted analysis and everything known about its progress"""
+
+    def __init__(self, kind: str, params: dict):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = "queued"
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+        self.events = []
+        self._events_changed = threading.Condition()
+        # (event loop, asyncio.Event) of async streams, woken from whichever thread emits
+        self._listeners = []
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def emit(self, event: dict):
+        """Record a progress event and wake up anyone streaming this job"""
+        with self._events_changed:
+            self.events.append({"id": len(self.events), "time": time.time(), **event})
+            self._notify()
+
+    def _notify(self):
+        # Callers hold self._events_changed
+        self._events_changed.notify_all()
+        for loop, changed in self._listeners:
+            try:
+                loop.call_soon_threadsafe(changed.set)
+            except RuntimeError:
+                # The stream's event loop has already closed
+                continue
+
+    def add_listener(self, loop, changed):
+        """Set the asyncio.Event ``changed`` on ``loop`` whenever an event is emitted or the job finishes"""
+        with self._events_changed:
+            self._listeners.append((loop, changed))
+
+    def remove_listener(self, loop, changed):
+        with self._events_changed:
+            self._listeners.remove((loop, changed))
+
+    def events_after(self, after: int):
+        with self._events_changed:
+            return self.events[after:]
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """Run submitted work on a bounded thread pool and keep track of it by job id"""
+
+    def __init__(self, max_workers: int = JOB_WORKERS, queue_limit: int = JOB_QUEUE_LIMIT, history: int = JOB_HISTORY):
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="job")
+        self._queue_limit = queue_limit
+        self._history = history
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn, *args, params=None, **kwargs) -> Job:
+        """Queue ``fn(*args, on_event=job.emit, **kwargs)`` and return its job right away"""
+        job = Job(kind, params or {})
+        with self._lock:
+            queued = sum(1 for existing in self._jobs.values() if existing.status == "queued")
+            if queued >= self._queue_limit:
+                raise JobQueueFull(f"{queued} jobs are already waiting; try again later")
+            self._jobs[job.id] = job
+            self._forget_finished()
+        job.emit({"event": "job_queued"})
+        self._pool.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: Job, fn, args, kwargs):
+        job.status = "running"
+        job.started = time.time()
+        job.emit({"event": "job_started"})
+        try:
+            job.result = fn(*args, on_event=job.emit, **kwargs)
+            status = "completed"
+        except Exception as e:
+            job.error = str(e)
+            status = "failed"
+        job.finished = time.time()
+        # The final event goes out before the status flips, so streams see it before they stop
+        job.emit({"event": f"job_{status}", "duration": round(job.finished - job.started, 3), "error": job.error})
+        with job._events_changed:
+            job.status = status
+            job._notify()
+
+    def _forget_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self._history)]:
+            del self._jobs[job_id]
+
+
+job_manager = JobManager()
@@ -0,0 +1,168 @@
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from crewai import LLM
+
+# Opt-in: set LLM_CACHE=1 to answer repeated identical requests from disk
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "0") == "1"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite3")
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_HOURS", "168")) * 3600
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+# Set inside bypass() so requests in that scope always reach the provider
+_bypass = contextvars.ContextVar("llm_cache_bypass", default=False)
+
+# Paces requests that reach the provider; installed with set_rate_limiter()
+_rate_limiter = None
+
+
+def cache_key(model: str, messages, tools, temperature) -> str:
+    """Fingerprint of everything that determines a completion"""
+    payload = {
+        "model": model,
+        "messages": messages,
+        "tools": tools,
+        "temperature": temperature,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class ResponseCache:
+    """SQLite store of LLM responses with a TTL and least-recently-used size eviction"""
+
+    def __init__(self, path=LLM_CACHE_PATH, ttl_seconds=LLM_CACHE_TTL_SECONDS, max_bytes=LLM_CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def _connect(self):
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+                "created REAL NOT NULL, last_used REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def get(self, key: str):
+        """Return the cached response for ``key``, or None when missing or expired"""
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT response FROM responses WHERE key = ? AND created >= ?",
+                (key, now - self.ttl_seconds),
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            connection.commit()
+        return row[0]
+
+    def put(self, key: str, response: str):
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created, last_used, size) VALUES (?, ?, ?, ?, ?)",
+                (key, response, now, now, len(response.encode("utf-8"))),
+            )
+            self._evict(connection, now)
+            connection.commit()
+
+    def _evict(self, connection, now: float):
+        connection.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = connection.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+
+
+response_cache = ResponseCache()
+
+
+@contextmanager
+def bypass():
+    """Send every LLM request made inside this block to the provider, skipping the cache"""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+class RequestRateLimiter:
+    """Spaces provider requests evenly to at most ``per_minute`` a minute.
+
+    ``lock`` and ``next_slot`` (a ``multiprocessing.Value('d')``) may be
+    shared between processes, making the limit global to all of them.
+    """
+
+    def __init__(self, per_minute: float, lock, next_slot):
+        self.interval = 60.0 / per_minute
+        self.lock = lock
+        self.next_slot = next_slot
+
+    def acquire(self):
+        with self.lock:
+            now = time.time()
+            slot = max(now, self.next_slot.value)
+            self.next_slot.value = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def set_rate_limiter(limiter):
+    """Pace every request CachedLLM sends to the provider in this process; None removes the limit"""
+    global _rate_limiter
+    _rate_limiter = limiter
+
+
+class CachedLLM(LLM):
+    """LLM that answers repeated identical requests from the response cache.
+
+    Requests are keyed by (model, messages, tools, temperature). The cache is
+    skipped when it is disabled, inside ``bypass()``, for instances built
+    with ``use_cache=False``, and for native function calling, where the
+    call itself executes tools. Requests that reach the provider go through
+    the rate limiter when one is set; cache hits do not.
+    """
+
+    def __init__(self, *args, use_cache: bool = True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.use_cache = use_cache
+
+    def _provider_call(self, messages, tools, callbacks, available_functions, **kwargs):
+        if _rate_limiter is not None:
+            _rate_limiter.acquire()
+        return super().call(messages, tools, callbacks, available_functions, **kwargs)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        if not LLM_CACHE_ENABLED or not self.use_cache or _bypass.get() or available_functions:
+            return self._provider_call(messages, tools, callbacks, available_functions, **kwargs)
+
+        key = cache_key(self.model, messages, tools, getattr(self, "temperature", None))
+        cached = response_cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = self._provider_call(messages, tools, callbacks, available_functions, **kwargs)
+        if isinstance(response, str) and response:
+            response_cache.put(key, response)
+        return response
@@ -1,11 +1,18 @@
+import asyncio
+import hashlib
+import json
 import os
+import tempfile
+import threading
 from pathlib import Path
-from fastapi import FastAPI, UploadFile, File
+from fastapi import FastAPI, Header, HTTPException, Response, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
-# Import your crew setup
-from crew_test import crew   # your existing code (the big script) should be in crew_agents.py
+from jobs import JobQueueFull, job_manager
+from run_store import CREW_PIPELINE, is_run_id, load_run_result, run_key, run_output_dir, save_run_result
 
 # Load environment variables
 load_dotenv()
@@ -17,33 +24,222 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Seconds between keep-alive comments on an idle event stream
+EVENT_KEEPALIVE_SECONDS = 15
+
+# Uploaded PDFs are stored once, named after their content hash
+UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "uploads"))
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", "50")) * 1024 * 1024
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+# Latest job per run id; a run's folder and checkpoints may only have one job working on them
+_run_jobs = {}
+_run_jobs_lock = threading.Lock()
+
+def _run_crew_job(pdf_path, resume, on_event=None):
+    # Imported here so the server starts without loading CrewAI and its tools
+    from crew_test import build_crew, run_crew
+
+    crew, run_id = build_crew(str(pdf_path), resume=resume)
+    result = str(run_crew(crew, run_id, resume=resume, on_event=on_event))
+    save_run_result(run_id, {"result": result})
+    return result
+
+def _file_sha256(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(UPLOAD_CHUNK_BYTES), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+async def _save_upload(file):
+    """Stream an upload to disk in chunks and store it under its SHA-256; returns the hash and path"""
+    UPLOAD_DIR.mkdir(exist_ok=True)
+    sha = hashlib.sha256()
+    size = 0
+    tmp = tempfile.NamedTemporaryFile(dir=UPLOAD_DIR, suffix=".part", delete=False)
+    try:
+        with tmp:
+            while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Upload exceeds the {MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit"
+                    )
+                sha.update(chunk)
+                await run_in_threadpool(tmp.write, chunk)
+        digest = sha.hexdigest()
+        pdf_path = UPLOAD_DIR / f"{digest}.pdf"
+        if pdf_path.exists():
+            # Identical content is already stored
+            os.unlink(tmp.name)
+        else:
+            os.replace(tmp.name, pdf_path)
+    except BaseException:
+        if os.path.exists(tmp.name):
+            os.unlink(tmp.name)
+        raise
+    return digest, pdf_path
+
+async def _job_events(job, after):
+    """Server-sent events for a job, ending once the job has finished and every event was sent.
+
+    The stream waits on the event loop, woken by the job's worker thread, so
+    idle streams do not hold threads of the pool the sync endpoints run on.
+    """
+    changed = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    job.add_listener(loop, changed)
+    try:
+        while True:
+            # Cleared before reading, so an event emitted after the read sets it again
+            changed.clear()
+            events = job.events_after(after)
+            for event in events:
+                yield f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event)}\n\n"
+            after += len(events)
+            if job.done and after >= len(job.events):
+                return
+            if not events:
+                try:
+                    await asyncio.wait_for(changed.wait(), EVENT_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+    finally:
+        job.remove_listener(loop, changed)
+
+def _submit(kind, params, pdf_path, resume):
+    """Queue a run, or join the job already working on the same run id"""
+    run_id = params["run_id"]
+    with _run_jobs_lock:
+        active = _run_jobs.get(run_id)
+        if active is not None and not active.done:
+            if not resume:
+                # Starting over would clear the checkpoints the running job is writing
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Job {active.id} is already analysing this document; wait for it or resume instead"
+                )
+            return active
+        try:
+            job = job_manager.submit(kind, _run_crew_job, pdf_path, resume, params=params)
+        except JobQueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        for finished in [key for key, existing in _run_jobs.items() if existing.done]:
+            del _run_jobs[finished]
+        _run_jobs[run_id] = job
+    return job
+
 # Request model
 class AnalysisRequest(BaseModel):
     pdf_path: str
+    resume: bool = True  # Reuse tasks completed by an interrupted run
 
 @app.get("/")
 def home():
     return {"message": "🚀 AI Knowledge Navigator API is running!"}
 
-@app.post("/run-analysis")
+@app.get("/tools")
+def tools():
+    """
+    Tools built so far in this process, with their construction time, and tools skipped for missing keys.
+    """
+    from tool_registry import skipped_tools, tool_timings
+
+    return {
+        "initialised": {name: round(seconds, 4) for name, seconds in tool_timings().items()},
+        "skipped": skipped_tools(),
+    }
+
+@app.post("/run-analysis", status_code=202)
 def run_analysis(request: AnalysisRequest):
     """
-    Run the full CrewAI pipeline on a given PDF path.
+    Queue the full CrewAI pipeline on a given PDF path and return its job id.
+    A document already being analysed returns the running job; with resume=false it is rejected with 409.
     """
-    result = crew.kickoff(inputs={"pdf_path": request.pdf_path})
-    return {"status": "completed", "result": str(result)}
+    if not Path(request.pdf_path).is_file():
+        raise HTTPException(status_code=404, detail=f"PDF not found: {request.pdf_path}")
+    run_id = run_key(_file_sha256(request.pdf_path), CREW_PIPELINE)
+    job = _submit("run-analysis", {"pdf_path": request.pdf_path, "run_id": run_id}, request.pdf_path, request.resume)
+    return {"status": job.status, "job_id": job.id, "run_id": run_id}
 
-@app.post("/upload-pdf/")
-async def upload_pdf(file: UploadFile = File(...)):
+@app.post("/upload-pdf/", status_code=202)
+async def upload_pdf(response: Response, file: UploadFile = File(...), resume: bool = True):
     """
-    Upload a PDF and run analysis directly.
+    Upload a PDF and queue its analysis, returning the job id.
+    A document that was already analysed returns its stored result instead, and one that is
+    being analysed returns the running job (409 with resume=false).
     """
-    pdf_path = Path(f"./uploads/{file.filename}")
-    pdf_path.parent.mkdir(exist_ok=True)
+    digest, pdf_path = await _save_upload(file)
+    run_id = run_key(digest, CREW_PIPELINE)
+    
+    stored = load_run_result(run_id) if resume else None
+    if stored is not None:
+        response.status_code = 200
+        return {"status": "completed", "result": stored["result"], "pdf_used": file.filename,
+                "document_sha256": digest, "run_id": run_id, "cached": True}
+    
+    job = _submit("upload-pdf", {"pdf_used": file.filename, "document_sha256": digest, "run_id": run_id},
+                  pdf_path, resume)
+    return {"status": job.status, "job_id": job.id, "pdf_used": file.filename, "document_sha256": digest,
+            "run_id": run_id}
 
-    with open(pdf_path, "wb") as f:
-        f.write(await file.read())
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    """
+    Status of a submitted analysis job.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.get("/runs/{run_id}/outputs.zip")
+def download_outputs(run_id: str):
+    """
+    Stream a zip of everything the agents generated for a run, without building the archive in memory.
+    """
+    from output_export import iter_output_zip
 
-    result = crew.kickoff(inputs={"pdf_path": str(pdf_path)})
-    return {"status": "completed", "result": str(result), "pdf_used": file.filename}
+    output_root = run_output_dir(run_id)
+    if not is_run_id(run_id) or not output_root.is_dir():
+        raise HTTPException(status_code=404, detail="Run not found")
+    return StreamingResponse(
+        iter_output_zip(base=output_root),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="outputs-{run_id[:12]}.zip"'},
+    )
+
+@app.get("/jobs/{job_id}/events")
+def job_events(job_id: str, last_event_id: str = Header(None)):
+    """
+    Stream a job's progress as server-sent events: task starts, agent steps and tool calls,
+    and task completions with durations and estimated token counts. The estimates
+    (estimated_input_tokens, estimated_output_tokens) cover the task's prompt, context
+    and output only; agent system prompts, tool results and repeated agent iterations
+    are not included, so actual usage is higher.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    # A reconnecting EventSource continues after the last event it received
+    after = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+    return StreamingResponse(
+        _job_events(job, after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/jobs/{job_id}/result")
+def job_result(job_id: str):
+    """
+    Output of a finished analysis job.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not job.done:
+        raise HTTPException(status_code=409, detail=f"Job is still {job.status}")
+    return {"job_id": job.id, "status": job.status, "result": job.result, "error": job.error, **job.params}
 
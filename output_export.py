@@ -0,0 +1,69 @@
+import os
+import zipfile
+from pathlib import Path
+
+from file_index import OUTPUT_FOLDERS
+
+# Bytes read from a file per step, and roughly the size of each chunk yielded
+EXPORT_CHUNK_BYTES = int(os.getenv("EXPORT_CHUNK_KB", "256")) * 1024
+
+
+class _ChunkSink:
+    """Write-only stream that collects what zipfile writes until the generator takes it"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def take(self):
+        """Everything written since the last call, as a list of at most one chunk"""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return [data] if data else []
+
+
+def _output_files(folders, base):
+    for folder in folders:
+        folder_path = Path(base) / folder
+        if not folder_path.is_dir():
+            continue
+        for path in sorted(folder_path.rglob("*")):
+            if path.is_file():
+                yield path, path.relative_to(base).as_posix()
+
+
+def iter_output_zip(folders=OUTPUT_FOLDERS, base=".", chunk_bytes: int = EXPORT_CHUNK_BYTES):
+    """Yield a zip archive of the output folders chunk by chunk.
+
+    Files are compressed as they are read, so neither the archive nor any
+    whole file is ever held in memory; entries are stored under their
+    folder name, e.g. ``code_output/src/app.py``.
+    """
+    sink = _ChunkSink()
+    # The sink cannot seek, so zipfile writes sizes after each entry instead of patching headers
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for path, arcname in _output_files(folders, base):
+            try:
+                source = open(path, "rb")
+            except OSError:
+                continue
+            with source, archive.open(arcname, mode="w", force_zip64=True) as entry:
+                while True:
+                    data = source.read(chunk_bytes)
+                    if not data:
+                        break
+                    entry.write(data)
+                    yield from sink.take()
+            yield from sink.take()
+    yield from sink.take()
@@ -0,0 +1,71 @@
+import threading
+from pathlib import Path
+
+from file_index import LISTED_SUFFIXES
+from run_store import RUNS_DIR
+
+
+class OutputWatcher:
+    """Collects change notifications for the runs' output folders.
+
+    With the optional ``watchdog`` package the folders are watched through
+    inotify (or the platform equivalent) and every created, modified, moved
+    or deleted file bumps ``version``. Without it, or when the watches cannot
+    be set up (e.g. the inotify watch limit is reached), ``available`` is
+    False and callers fall back to rescanning on their own schedule.
+    """
+
+    def __init__(self, folders=(RUNS_DIR,)):
+        self.folders = [Path(folder) for folder in folders]
+        self.version = 0
+        self._changes = []
+        self._lock = threading.Lock()
+        self._observer = None
+
+    @property
+    def available(self) -> bool:
+        return self._observer is not None
+
+    def start(self):
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return self
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory:
+                    return
+                for path in (event.src_path, getattr(event, "dest_path", "")):
+                    if path and Path(path).suffix in LISTED_SUFFIXES:
+                        watcher._record(Path(path))
+
+        observer = Observer()
+        observer.daemon = True
+        try:
+            for folder in self.folders:
+                folder.mkdir(parents=True, exist_ok=True)
+                observer.schedule(Handler(), str(folder), recursive=True)
+            observer.start()
+        except OSError:
+            # Out of inotify watches or a folder that cannot be watched; rescanning still works
+            observer.stop()
+            return self
+        self._observer = observer
+        return self
+
+    def _record(self, path: Path):
+        with self._lock:
+            self.version += 1
+            self._changes.append((self.version, path))
+            # Only the recent past is ever asked for
+            del self._changes[:-1000]
+
+    def changes_since(self, version: int):
+        """Paths changed after ``version``, oldest first and without repeats"""
+        with self._lock:
+            paths = [path for changed, path in self._changes if changed > version]
+        return list(dict.fromkeys(paths))
@@ -0,0 +1,310 @@
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import PyPDF2
+
+# Documents shorter than this are extracted in-process; a pool costs more than it saves
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "24"))
+
+# Number of consecutive pages handed to a worker at a time
+PAGES_PER_BATCH = int(os.getenv("PDF_PAGES_PER_BATCH", "16"))
+
+# Worker processes used for extraction (0 means one per CPU)
+EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "0"))
+
+# Batches extracted ahead of the consumer; bounds memory while streaming
+STREAM_BUFFER_BATCHES = int(os.getenv("PDF_STREAM_BUFFER_BATCHES", "4"))
+
+# Bump when extraction or cleaning changes so cached pages are extracted again
+EXTRACTOR_VERSION = "1"
+
+# On-disk cache of extracted pages, keyed by the SHA-256 of the PDF bytes
+EXTRACTION_CACHE_DIR = Path(os.getenv("EXTRACTION_CACHE_DIR", ".extraction_cache"))
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_MB", "256")) * 1024 * 1024
+
+# Common PDF encoding issues left behind by PyPDF2
+_CHARACTER_FIXES = {
+    '\x96': '-',
+    '\x97': '-',
+    '\x94': '"',
+    '\x93': '"',
+}
+
+# PdfReader opened once per worker process by _init_worker
+_worker_reader = None
+
+
+class PageText(NamedTuple):
+    """Cleaned text of one page; ``error`` is set when the page could not be extracted"""
+    number: int
+    text: str
+    error: Optional[str] = None
+
+
+def clean_page_text(page_text: str) -> str:
+    """Replace problematic bytes that PyPDF2 leaves in extracted text"""
+    for bad, good in _CHARACTER_FIXES.items():
+        page_text = page_text.replace(bad, good)
+    return page_text
+
+
+def _available_cpus() -> int:
+    """CPUs this process may actually run on (containers often pin fewer than cpu_count)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _pdf_source(pdf_file):
+    """Turn a path or file-like object into something every process can reopen"""
+    if isinstance(pdf_file, (str, os.PathLike)):
+        return os.fspath(pdf_file)
+    if hasattr(pdf_file, "getvalue"):
+        return pdf_file.getvalue()
+    pdf_file.seek(0)
+    return pdf_file.read()
+
+
+def source_digest(source) -> str:
+    """SHA-256 of the PDF bytes, read in blocks when the source is a path"""
+    if isinstance(source, bytes):
+        return hashlib.sha256(source).hexdigest()
+    sha = hashlib.sha256()
+    with open(source, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def text_fingerprint(text: str) -> str:
+    """SHA-256 of text with its whitespace normalised, so re-flowed copies of the same text match"""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+class ExtractionCache:
+    """Size-bounded LRU cache of extracted pages, one JSON-lines file per document"""
+
+    def __init__(self, directory=EXTRACTION_CACHE_DIR, max_bytes=EXTRACTION_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def _entry_path(self, digest: str) -> Path:
+        return self.directory / f"{digest}-x{EXTRACTOR_VERSION}.jsonl"
+
+    def open_entry(self, digest: str):
+        """Return a generator over a cached document's pages, or None on a miss"""
+        entry = self._entry_path(digest)
+        try:
+            f = open(entry, 'r', encoding='utf-8')
+            # The file's mtime doubles as its last-used time for LRU eviction
+            os.utime(entry)
+        except OSError:
+            return None
+        return self._read_entry(f)
+
+    def _read_entry(self, f):
+        with f:
+            for line in f:
+                yield PageText(*json.loads(line))
+
+    def record(self, digest: str, pages):
+        """Pass pages through while writing them to the cache.
+
+        The entry only becomes visible once the whole document has been
+        consumed, so an abandoned stream never leaves a partial entry behind.
+        """
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            entry = self._entry_path(digest)
+            # Unique per writer: threads of one process may record the same document at once
+            fd, tmp_name = tempfile.mkstemp(dir=self.directory, prefix=f"{entry.stem}.", suffix=".tmp")
+            tmp_entry = Path(tmp_name)
+            f = open(fd, 'w', encoding='utf-8')
+        except OSError:
+            # The cache is an optimisation; a read-only disk must not fail extraction
+            yield from pages
+            return
+
+        completed = False
+        try:
+            with f:
+                for page in pages:
+                    f.write(json.dumps(list(page)) + "\n")
+                    yield page
+            completed = True
+        finally:
+            if completed:
+                try:
+                    os.replace(tmp_entry, entry)
+                except OSError:
+                    # Another writer stored the same pages first; its entry serves as the cache hit
+                    tmp_entry.unlink(missing_ok=True)
+                self.evict()
+            else:
+                tmp_entry.unlink(missing_ok=True)
+
+    def evict(self):
+        entries = []
+        for entry in self.directory.glob("*.jsonl"):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                entry.unlink()
+            except OSError:
+                continue
+            total -= size
+
+
+extraction_cache = ExtractionCache()
+
+
+def _open_reader(source):
+    if isinstance(source, bytes):
+        return PyPDF2.PdfReader(io.BytesIO(source))
+    return PyPDF2.PdfReader(source)
+
+
+def _init_worker(source):
+    """Open the document once per worker instead of once per batch"""
+    global _worker_reader
+    _worker_reader = _open_reader(source)
+
+
+def _extract_page(reader, page_num: int) -> PageText:
+    """Extract one page and capture a failure instead of raising"""
+    try:
+        page_text = reader.pages[page_num].extract_text()
+    except Exception as e:
+        return PageText(page_num + 1, "", str(e))
+    return PageText(page_num + 1, clean_page_text(page_text) if page_text else "")
+
+
+def _extract_range(start: int, stop: int):
+    """Extract pages [start, stop) in a worker process"""
+    return [_extract_page(_worker_reader, page_num) for page_num in range(start, stop)]
+
+
+def _page_ranges(page_count: int):
+    return [(batch_start, min(batch_start + PAGES_PER_BATCH, page_count))
+            for batch_start in range(0, page_count, PAGES_PER_BATCH)]
+
+
+def _iter_extracted(source, max_workers):
+    reader = _open_reader(source)
+    page_count = len(reader.pages)
+    max_workers = max_workers or EXTRACT_WORKERS or _available_cpus()
+
+    next_page = 0
+    if page_count >= PARALLEL_MIN_PAGES and max_workers > 1:
+        ranges = deque(_page_ranges(page_count))
+        try:
+            # Spawned, not forked: the hosts are multi-threaded and a forked worker can inherit a held lock
+            with ProcessPoolExecutor(
+                max_workers=min(max_workers, len(ranges)),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(source,),
+            ) as pool:
+                # Keep a bounded window of batches in flight and hand them out in order
+                in_flight = deque()
+                while ranges or in_flight:
+                    while ranges and len(in_flight) < max(STREAM_BUFFER_BATCHES, 1):
+                        in_flight.append(pool.submit(_extract_range, *ranges.popleft()))
+                    for page in in_flight.popleft().result():
+                        yield page
+                        next_page = page.number
+        except (OSError, BrokenProcessPool):
+            # No usable process pool here (sandboxed host, worker crash); finish in-process
+            pass
+
+    for page_num in range(next_page, page_count):
+        yield _extract_page(reader, page_num)
+
+
+def iter_pages(pdf_file, max_workers=None, use_cache=True):
+    """Yield the cleaned text of every page lazily, in page order.
+
+    Large documents are split into page ranges that are extracted on a
+    process pool, with only a bounded number of batches extracted ahead of
+    the consumer. Pages are cached on disk by document digest, so a repeat
+    document is streamed back from the cache without touching PyPDF2.
+    """
+    source = _pdf_source(pdf_file)
+    if not use_cache:
+        yield from _iter_extracted(source, max_workers)
+        return
+
+    digest = source_digest(source)
+    cached = extraction_cache.open_entry(digest)
+    if cached is not None:
+        yield from cached
+        return
+    yield from extraction_cache.record(digest, _iter_extracted(source, max_workers))
+
+
+def extract_pages(pdf_file, max_workers=None, use_cache=True):
+    """Extract every page at once.
+
+    Returns ``(pages, errors)`` where ``pages`` holds one cleaned string per
+    page and ``errors`` holds ``(page_number, message)`` for pages that could
+    not be extracted.
+    """
+    pages, errors = [], []
+    for page in iter_pages(pdf_file, max_workers, use_cache):
+        pages.append(page.text)
+        if page.error:
+            errors.append((page.number, page.error))
+    return pages, errors
+
+
+def join_pages(pages) -> str:
+    """Join extracted pages into one document, skipping pages without text"""
+    return "".join(page_text + "\n" for page_text in pages if page_text)
+
+
+def iter_chunks(pages, max_chars: int):
+    """Group streamed pages into text chunks of at most ``max_chars`` characters.
+
+    Only the chunk being built is held in memory, so consumers that work
+    chunk by chunk scale with the chunk size rather than the document size.
+    """
+    buffer, size = [], 0
+    for page in pages:
+        page_text = page.text if isinstance(page, PageText) else page
+        if not page_text:
+            continue
+        page_text += "\n"
+        while page_text:
+            room = max_chars - size
+            if len(page_text) <= room:
+                buffer.append(page_text)
+                size += len(page_text)
+                break
+            if buffer and len(page_text) <= max_chars:
+                yield "".join(buffer)
+                buffer, size = [], 0
+                continue
+            # A single page longer than a chunk is split across chunks
+            buffer.append(page_text[:room])
+            yield "".join(buffer)
+            buffer, size = [], 0
+            page_text = page_text[room:]
+    if buffer:
+        yield "".join(buffer)
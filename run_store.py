@@ -0,0 +1,266 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from document_index import drop_index
+
+# Bump whenever agents, tasks or prompts change so stored runs are not reused
+PIPELINE_VERSION = "8"
+
+# Folder holding finished run results, one JSON file per document
+RUN_CACHE_DIR = Path(os.getenv("RUN_CACHE_DIR", ".run_cache"))
+
+
+def document_digest(data: bytes) -> str:
+    """Return the SHA-256 hex digest of a document's raw bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+# Pipelines sharing the runs folder: the Streamlit app's tasks, and crew_test's (API and batch)
+APP_PIPELINE = "app"
+CREW_PIPELINE = "crew"
+
+
+def run_key(digest: str, pipeline: str) -> str:
+    """Build the run id of a document under a pipeline and the current pipeline version.
+
+    Pipelines run different tasks, so each gets its own id and with it its
+    own output folder, checkpoints and stored result.
+    """
+    return f"{digest}-{pipeline}-v{PIPELINE_VERSION}"
+
+
+def _write_json(path: Path, payload):
+    """Write JSON atomically through a temp file of its own, so concurrent writers never share one"""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    try:
+        with open(fd, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def load_run_result(key: str):
+    """Load a stored run for the given key, or None if it was never saved"""
+    run_file = RUN_CACHE_DIR / f"{key}.json"
+    try:
+        with open(run_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_run_result(key: str, run: dict):
+    """Persist a finished run so later sessions can re-render it without the crew"""
+    RUN_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    run_file = RUN_CACHE_DIR / f"{key}.json"
+    _write_json(run_file, run)
+
+
+# Per-run working folders, one per run id
+RUNS_DIR = Path(os.getenv("RUNS_DIR", "runs"))
+
+# Runs older than this, or beyond the newest RUN_RETENTION_COUNT, are deleted
+RUN_RETENTION_DAYS = float(os.getenv("RUN_RETENTION_DAYS", "14"))
+RUN_RETENTION_COUNT = int(os.getenv("RUN_RETENTION_COUNT", "100"))
+
+# Run ids are "<sha256>-<pipeline>-v<version>" (older ones lack the pipeline); anything else is never used as a path
+_RUN_ID = re.compile(r"[0-9a-f]{64}(-[a-z]+)?-v\d+")
+
+
+def is_run_id(value: str) -> bool:
+    return bool(_RUN_ID.fullmatch(value))
+
+
+def run_output_dir(run_id: str, runs_dir=RUNS_DIR) -> Path:
+    """Folder the agents of a run write their files into"""
+    return Path(runs_dir) / run_id / "outputs"
+
+
+def save_run_file(run_id: str, name: str, payload, runs_dir=RUNS_DIR):
+    """Store JSON next to a run's outputs, e.g. inputs its later attempts must see unchanged"""
+    run_dir = Path(runs_dir) / run_id
+    run_dir.mkdir(parents=True, exist_ok=True)
+    _write_json(run_dir / name, payload)
+
+
+def load_run_file(run_id: str, name: str, runs_dir=RUNS_DIR):
+    try:
+        with open(Path(runs_dir) / run_id / name, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def prepare_run_dir(run_id: str, runs_dir=RUNS_DIR) -> Path:
+    """Create a run's output folder and mark the run as recently used"""
+    output_dir = run_output_dir(run_id, runs_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    os.utime(output_dir.parent)
+    return output_dir
+
+
+def retain_run(run_id: str, runs_dir=RUNS_DIR):
+    """Exempt a run from collect_old_runs, e.g. a batch run whose report must outlive the retention window.
+
+    The run stays until its folder, or the ``retain`` marker in it, is removed by hand.
+    """
+    run_dir = Path(runs_dir) / run_id
+    run_dir.mkdir(parents=True, exist_ok=True)
+    (run_dir / "retain").touch()
+
+
+def collect_old_runs(keep=(), runs_dir=RUNS_DIR, max_age_days=RUN_RETENTION_DAYS, max_runs=RUN_RETENTION_COUNT,
+                     run_cache_dir=None):
+    """Delete the folders, stored results and retrieval indexes of runs past the retention policy.
+
+    The stored result goes with the folder, so a collected run is analysed
+    again instead of being shown without its files. Runs in ``keep`` and
+    runs marked with ``retain_run`` are never touched, nor counted.
+    """
+    run_cache_dir = Path(run_cache_dir or RUN_CACHE_DIR)
+    runs = []
+    for run_dir in Path(runs_dir).glob("*"):
+        if run_dir.is_dir() and is_run_id(run_dir.name) and run_dir.name not in keep \
+                and not (run_dir / "retain").exists():
+            try:
+                runs.append((run_dir.stat().st_mtime, run_dir))
+            except OSError:
+                continue
+    runs.sort(reverse=True)
+    cutoff = time.time() - max_age_days * 86400
+    removed = []
+    for position, (last_used, run_dir) in enumerate(runs):
+        if last_used < cutoff or position >= max_runs:
+            # Results first: a result whose folder is gone would be served without its files
+            (run_cache_dir / f"{run_dir.name}.json").unlink(missing_ok=True)
+            # Runs before per-pipeline ids stored the API's result under a suffix
+            (run_cache_dir / f"{run_dir.name}-api.json").unlink(missing_ok=True)
+            shutil.rmtree(run_dir, ignore_errors=True)
+            drop_index(run_dir.name)
+            removed.append(run_dir.name)
+    return removed
+
+
+class RunCheckpoint:
+    """Outputs of a run's completed tasks, so an interrupted run can resume.
+
+    Each task is stored with the fingerprint of its prompt, agent and inputs;
+    a checkpoint is only reused while that fingerprint still matches.
+    """
+
+    def __init__(self, run_id: str, runs_dir=RUNS_DIR):
+        self.run_id = run_id
+        self.directory = Path(runs_dir) / run_id / "checkpoints"
+
+    def _task_file(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    @property
+    def _plan_file(self) -> Path:
+        return self.directory.parent / "tasks.json"
+
+    def save_plan(self, fingerprints):
+        """Record the fingerprints of the tasks the current attempt runs"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        _write_json(self._plan_file, fingerprints)
+
+    def load_plan(self):
+        try:
+            with open(self._plan_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def load_entry(self, key: str):
+        """Return everything stored for a task, or None if it never completed"""
+        try:
+            with open(self._task_file(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load(self, key: str, fingerprint: str):
+        """Return the stored output of a task, or None if it has to run again"""
+        saved = self.load_entry(key)
+        if saved is None or saved.get("fingerprint") != fingerprint:
+            return None
+        return saved["raw"]
+
+    def save(self, key: str, fingerprint: str, raw: str, prompt_fingerprint: str = None):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        task_file = self._task_file(key)
+        _write_json(task_file, {"fingerprint": fingerprint, "prompt_fingerprint": prompt_fingerprint, "raw": raw})
+
+    def completed(self, fingerprints=None):
+        """Keys of the tasks whose stored output is still valid.
+
+        ``fingerprints`` maps task keys to their current fingerprints and
+        defaults to the plan of the last attempt; stored outputs of other
+        tasks, or of a different version of a task, are not counted.
+        """
+        if fingerprints is None:
+            fingerprints = self.load_plan()
+        return sorted(key for key, fingerprint in fingerprints.items() if self.load(key, fingerprint) is not None)
+
+    def clear(self):
+        for task_file in self.directory.glob("*.json"):
+            task_file.unlink(missing_ok=True)
+
+
+def document_family(file_name: str) -> str:
+    """Name shared by all versions of a document, e.g. 'Proposal v3.pdf' -> 'proposal'"""
+    stem = Path(file_name).stem.lower().strip()
+    previous = None
+    while stem != previous:
+        previous = stem
+        stem = re.sub(r"[\s_-]*(v\d+|\(\d+\)|rev\d+|final|draft)$", "", stem).strip()
+    return stem or Path(file_name).stem.lower()
+
+
+def save_document_manifest(run_id: str, file_name: str, page_hashes, overview: str = None, runs_dir=RUNS_DIR):
+    """Record which document version a run analysed, page by page and by the fingerprint of its overview"""
+    run_dir = Path(runs_dir) / run_id
+    run_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {
+        "file_name": file_name,
+        "family": document_family(file_name),
+        "page_hashes": list(page_hashes),
+        "overview": overview,
+        "created": time.time(),
+    }
+    _write_json(run_dir / "document.json", manifest)
+
+
+def load_document_manifest(run_id: str, runs_dir=RUNS_DIR):
+    try:
+        with open(Path(runs_dir) / run_id / "document.json", 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def find_previous_version(file_name: str, exclude_run_id: str, runs_dir=RUNS_DIR):
+    """Most recent other run of the same document family that has completed tasks"""
+    family = document_family(file_name)
+    candidates = []
+    for manifest_file in Path(runs_dir).glob("*/document.json"):
+        run_id = manifest_file.parent.name
+        if run_id == exclude_run_id:
+            continue
+        manifest = load_document_manifest(run_id, runs_dir)
+        if manifest is None or manifest.get("family") != family:
+            continue
+        if not RunCheckpoint(run_id, runs_dir).completed():
+            continue
+        candidates.append((manifest["created"], run_id))
+    if not candidates:
+        return None
+    return max(candidates)[1]
@@ -0,0 +1,280 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from document_digest import estimate_tokens
+
+# Upper bound on tasks running at the same time
+MAX_PARALLEL_TASKS = int(os.getenv("MAX_PARALLEL_TASKS", "3"))
+
+# Separator CrewAI itself uses when joining task outputs into a context
+_CONTEXT_SEPARATOR = "\n\n----------\n\n"
+
+
+def task_key(task, position: int) -> str:
+    """Stable name of a task inside a run; unnamed tasks are keyed by position"""
+    return task.name or f"task_{position + 1}"
+
+
+def task_dependencies(tasks, sequential: bool = False):
+    """Read each task's real inputs from its CrewAI ``context``.
+
+    Returns ``{task_key: [task_key, ...]}``. A task without a context has no
+    inputs and may start right away, unless ``sequential`` is set: then it
+    depends on every earlier task, as in a CrewAI sequential process.
+    """
+    keys = {id(task): task_key(task, position) for position, task in enumerate(tasks)}
+    dependencies = {}
+    for position, task in enumerate(tasks):
+        if isinstance(task.context, list):
+            inputs = task.context
+        elif sequential:
+            inputs = tasks[:position]
+        else:
+            inputs = []
+        missing = [upstream for upstream in inputs if id(upstream) not in keys]
+        if missing:
+            raise ValueError(f"Task '{keys[id(task)]}' depends on a task that is not part of the run")
+        dependencies[keys[id(task)]] = [keys[id(upstream)] for upstream in inputs]
+    return dependencies
+
+
+def topological_order(dependencies):
+    """Task keys ordered so every task comes after its inputs; raises ValueError on a cycle"""
+    order, placed = [], set()
+    pending = list(dependencies)
+    while pending:
+        ready = [key for key in pending if all(upstream in placed for upstream in dependencies[key])]
+        if not ready:
+            raise ValueError(f"Tasks could never start because of a dependency cycle: {', '.join(pending)}")
+        order.extend(ready)
+        placed.update(ready)
+        pending = [key for key in pending if key not in placed]
+    return order
+
+
+def _agent_config(agent) -> dict:
+    llm = agent.llm if isinstance(agent.llm, str) else getattr(agent.llm, "model", repr(agent.llm))
+    return {
+        "role": agent.role,
+        "goal": agent.goal,
+        "backstory": agent.backstory,
+        "llm": llm,
+        "tools": sorted(type(tool).__name__ for tool in agent.tools or []),
+    }
+
+
+def _digest(payload) -> str:
+    encoded = json.dumps(payload, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def prompt_fingerprint(task, output_root=None) -> str:
+    """Fingerprint of a task's own prompt and agent, ignoring its upstream tasks.
+
+    Document passages are part of the prompt, so this changes exactly when
+    the parts of the document the task reads change. The run's own output
+    folder is left out, so runs writing to different folders still match.
+    """
+    description, expected_output = task.description, task.expected_output
+    if output_root is not None:
+        description = description.replace(str(output_root), "<output_root>")
+        expected_output = expected_output.replace(str(output_root), "<output_root>")
+    return _digest({
+        "description": description,
+        "expected_output": expected_output,
+        "agent": _agent_config(task.agent),
+    })
+
+
+def task_fingerprints(tasks, dependencies, output_root=None):
+    """Fingerprint each task's prompt, agent configuration and inputs.
+
+    Inputs are folded in by their own fingerprints, so two tasks match only
+    when they would send the same prompt to the same agent with the same
+    upstream work behind it. Tasks may be listed in any order; a dependency
+    cycle raises ValueError.
+    """
+    by_key = {task_key(task, position): task for position, task in enumerate(tasks)}
+    fingerprints = {}
+    for key in topological_order(dependencies):
+        fingerprints[key] = _digest({
+            "prompt": prompt_fingerprint(by_key[key], output_root),
+            "inputs": [fingerprints[upstream] for upstream in dependencies[key]],
+        })
+    # Task order, so the first of two identical tasks is the one that runs
+    return {key: fingerprints[key] for key in by_key}
+
+
+def find_duplicates(fingerprints):
+    """Map each duplicate task's key to the key of the first identical task"""
+    first_seen = {}
+    duplicates = {}
+    for key, fingerprint in fingerprints.items():
+        if fingerprint in first_seen:
+            duplicates[key] = first_seen[fingerprint]
+        else:
+            first_seen[fingerprint] = key
+    return duplicates
+
+
+def _report_collapsed(task, duplicate: str, original: str, context: str, output):
+    saved = estimate_tokens(task.description + task.expected_output + context) + estimate_tokens(output.raw)
+    print(f"Task '{duplicate}' is identical to '{original}'; reused its output (~{saved:,} tokens saved)")
+
+
+def _restored_output(task, raw: str):
+    from crewai.tasks.task_output import TaskOutput
+
+    return TaskOutput(
+        name=task.name,
+        description=task.description,
+        expected_output=task.expected_output,
+        agent=task.agent.role,
+        raw=raw,
+    )
+
+
+def _describe_step(step) -> dict:
+    """Summarise an agent step (tool call, tool result or final answer) for progress events"""
+    event = {"step": type(step).__name__}
+    tool = getattr(step, "tool", None)
+    if tool:
+        event["tool"] = tool
+        event["tool_input"] = str(getattr(step, "tool_input", ""))[:500]
+    return event
+
+
+def _execute(task, agent, context: str, key: str = None, on_event=None):
+    if on_event is None:
+        return task.execute_sync(agent=agent, context=context)
+
+    # The agent is not shared with a concurrently running task, so its callback can be swapped in
+    previous_callback = agent.step_callback
+
+    def step_callback(step):
+        on_event({"event": "task_step", "task": key, **_describe_step(step)})
+        if previous_callback is not None:
+            previous_callback(step)
+
+    agent.step_callback = step_callback
+    started = time.perf_counter()
+    on_event({"event": "task_started", "task": key, "agent": agent.role})
+    try:
+        output = task.execute_sync(agent=agent, context=context)
+    except Exception as e:
+        on_event({"event": "task_failed", "task": key, "error": str(e),
+                  "duration": round(time.perf_counter() - started, 3)})
+        raise
+    finally:
+        agent.step_callback = previous_callback
+    on_event({
+        "event": "task_completed",
+        "task": key,
+        "duration": round(time.perf_counter() - started, 3),
+        # Estimated from the task's own text; the agent's system prompt, tool results and retries are not counted
+        "estimated_input_tokens": estimate_tokens(task.description + task.expected_output + context),
+        "estimated_output_tokens": estimate_tokens(output.raw),
+    })
+    return output
+
+
+def run_task_graph(tasks, max_parallel: int = MAX_PARALLEL_TASKS, checkpoint=None, sequential: bool = False,
+                   on_event=None, output_root=None):
+    """Run CrewAI tasks as a dependency graph instead of a fixed sequence.
+
+    Every task whose inputs (its ``context`` tasks) have finished is started,
+    up to ``max_parallel`` at a time, and receives the outputs of those
+    inputs as its context. Tasks identical to an earlier one (same prompt,
+    agent configuration and inputs) are not executed again; they reuse that
+    task's output. Returns ``{task_key: TaskOutput}`` in task order. When one
+    task fails, no new tasks are started and the error is raised once the
+    running ones have finished.
+
+    With a ``RunCheckpoint``, every finished task is saved as it completes
+    and tasks already saved by an earlier, interrupted attempt are restored
+    instead of being run again.
+
+    ``on_event``, when given, is called with a dict for every task that
+    starts, takes an agent step (tool calls included), completes (with its
+    duration and token counts estimated from the task's prompt, context and
+    output, not the LLM's reported usage), fails, or is restored or reused
+    without running. It is called from worker threads.
+    """
+    dependencies = task_dependencies(tasks, sequential)
+    by_key = {task_key(task, position): task for position, task in enumerate(tasks)}
+    fingerprints = task_fingerprints(tasks, dependencies, output_root)
+    duplicates = find_duplicates(fingerprints)
+    outputs = {}
+    if checkpoint is not None:
+        checkpoint.save_plan(fingerprints)
+        for key, task in by_key.items():
+            raw = checkpoint.load(key, fingerprints[key])
+            if raw is not None:
+                outputs[key] = _restored_output(task, raw)
+                if on_event is not None:
+                    on_event({"event": "task_restored", "task": key})
+        for duplicate, original in duplicates.items():
+            if original in outputs:
+                outputs[duplicate] = outputs[original]
+                if on_event is not None:
+                    on_event({"event": "task_reused", "task": duplicate, "original": original})
+        if outputs:
+            print(f"Resuming run {checkpoint.run_id}: {len(outputs)} of {len(by_key)} tasks restored from checkpoints")
+    running = {}
+    busy_agents = set()
+    holds_agent = set()
+    failure = None
+
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as pool:
+        while True:
+            if failure is None:
+                for key, task in by_key.items():
+                    if len(running) >= max(1, max_parallel):
+                        break
+                    if key in outputs or key in running.values() or key in duplicates:
+                        continue
+                    if not all(upstream in outputs for upstream in dependencies[key]):
+                        continue
+                    context = _CONTEXT_SEPARATOR.join(outputs[upstream].raw for upstream in dependencies[key])
+                    # Agents keep per-execution state, so concurrent tasks of one agent each get a copy
+                    agent = task.agent
+                    owns_agent = id(agent) not in busy_agents
+                    if owns_agent:
+                        busy_agents.add(id(agent))
+                    else:
+                        agent = agent.copy()
+                    future = pool.submit(_execute, task, agent, context, key, on_event)
+                    running[future] = key
+                    if owns_agent:
+                        holds_agent.add(future)
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = running.pop(future)
+                if future in holds_agent:
+                    holds_agent.discard(future)
+                    busy_agents.discard(id(by_key[key].agent))
+                try:
+                    outputs[key] = future.result()
+                except Exception as e:
+                    failure = failure or e
+                    continue
+                if checkpoint is not None:
+                    checkpoint.save(key, fingerprints[key], outputs[key].raw, prompt_fingerprint(by_key[key], output_root))
+                for duplicate, original in duplicates.items():
+                    if original == key:
+                        outputs[duplicate] = outputs[key]
+                        context = _CONTEXT_SEPARATOR.join(outputs[upstream].raw for upstream in dependencies[duplicate])
+                        _report_collapsed(by_key[duplicate], duplicate, key, context, outputs[key])
+                        if on_event is not None:
+                            on_event({"event": "task_reused", "task": duplicate, "original": key})
+
+    if failure is not None:
+        raise failure
+    return {key: outputs[key] for key in by_key}
@@ -0,0 +1,73 @@
+import os
+import threading
+import time
+
+# Each tool: how to build it and the environment variables it cannot work without
+_TOOL_SPECS = {
+    "file_writer": ((), lambda: _crewai_tools().FileWriterTool()),
+    "serper": (("SERPER_API_KEY",), lambda: _crewai_tools().SerperDevTool()),
+    "github_search": (("GITHUB_TOKEN",), lambda: _crewai_tools().GithubSearchTool(
+        gh_token=os.getenv("GITHUB_TOKEN"),
+        content_types=['code', 'issue'],  # Options: code, repo, pr, issue
+        max_results=500  # Limit to 500 results to control token usage
+    )),
+    "linkup": (("LINKUP_API_KEY",), lambda: _crewai_tools().LinkupSearchTool(api_key=os.getenv("LINKUP_API_KEY"))),
+    "exa_search": (("EXA_API_KEY",), lambda: _crewai_tools().EXASearchTool(api_key=os.getenv("EXA_API_KEY"))),
+}
+
+_instances = {}
+_skipped = {}
+_timings = {}
+_lock = threading.Lock()
+
+
+def _crewai_tools():
+    import crewai_tools
+
+    return crewai_tools
+
+
+def get_tool(name: str):
+    """Return the process-wide instance of a tool, building it on first use.
+
+    Returns None when an API key the tool needs is not set; the reason is
+    printed once and kept in ``skipped_tools()``.
+    """
+    with _lock:
+        if name in _instances:
+            return _instances[name]
+        if name in _skipped:
+            return None
+        required_keys, factory = _TOOL_SPECS[name]
+        missing = [key for key in required_keys if not os.getenv(key)]
+        if missing:
+            _skipped[name] = f"missing {', '.join(missing)}"
+            print(f"Skipping tool '{name}': {_skipped[name]}")
+            return None
+        started = time.perf_counter()
+        _instances[name] = factory()
+        _timings[name] = time.perf_counter() - started
+        return _instances[name]
+
+
+def get_tools(*names):
+    """Instances of the named tools that are available, in the given order"""
+    return [tool for tool in (get_tool(name) for name in names) if tool is not None]
+
+
+def reset_tools():
+    """Forget every built and skipped tool, e.g. after API keys changed"""
+    with _lock:
+        _instances.clear()
+        _skipped.clear()
+        _timings.clear()
+
+
+def tool_timings():
+    """Seconds spent constructing each tool built so far in this process"""
+    return dict(_timings)
+
+
+def skipped_tools():
+    """Tools left out because of missing API keys, with the reason"""
+    return dict(_skipped)